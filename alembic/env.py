@@ -22,9 +22,10 @@ if database_url:
 
 from schemas.olympics_medals_schema import Base as OlympicsBase
 from schemas.countries_schema import Base as CountriesBase
+from schemas.games_schema import Base as GamesBase
 
 # Set target_metadata to include the models we are using for migrations
-target_metadata = [OlympicsBase.metadata, CountriesBase.metadata]
+target_metadata = [OlympicsBase.metadata, CountriesBase.metadata, GamesBase.metadata]
 
 
 def run_migrations_offline() -> None:
@@ -65,8 +66,11 @@ def run_migrations_online() -> None:
     )
 
     with connectable.connect() as connection:
+        # One transaction per revision, so online helpers that commit between batches
+        # never leave several revisions half-applied together
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection, target_metadata=target_metadata,
+            transaction_per_migration=True,
         )
 
         with context.begin_transaction():
@@ -0,0 +1,27 @@
+"""add lookup indexes concurrently
+
+Revision ID: 1e5aaa4fad77
+Revises: e3ff6361bd44
+Create Date: 2026-10-19 09:12:41.204518
+
+"""
+from typing import Sequence, Union
+
+from schemas.online_migrations import create_index_concurrently, drop_index_concurrently
+
+# revision identifiers, used by Alembic.
+revision: str = '1e5aaa4fad77'
+down_revision: Union[str, None] = 'e3ff6361bd44'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Index the join keys used by the merge without blocking ingestion
+    create_index_concurrently('ix_olympics_medals_nation_year', 'olympics_medals', ['nation', 'year'])
+    create_index_concurrently('ix_countries_country', 'countries', ['country'])
+
+
+def downgrade() -> None:
+    drop_index_concurrently('ix_countries_country', 'countries')
+    drop_index_concurrently('ix_olympics_medals_nation_year', 'olympics_medals')
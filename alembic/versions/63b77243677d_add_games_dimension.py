@@ -0,0 +1,64 @@
+"""add games dimension and key olympics_medals by it
+
+Revision ID: 63b77243677d
+Revises: 1e5aaa4fad77
+Create Date: 2026-10-19 10:03:17.550921
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from schemas.online_migrations import (
+    add_column_online,
+    add_foreign_key_online,
+    backfill_in_batches,
+    create_index_concurrently,
+    drop_column_online,
+    drop_foreign_key_online,
+    drop_index_concurrently,
+)
+
+# revision identifiers, used by Alembic.
+revision: str = '63b77243677d'
+down_revision: Union[str, None] = '1e5aaa4fad77'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'games',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('host_city', sa.String(length=100), nullable=True),
+        sa.Column('year', sa.Integer(), nullable=False),
+        sa.Column('season', sa.String(length=6), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('year', 'season', name='uq_games_year_season'),
+    )
+
+    add_column_online('olympics_medals', sa.Column('season', sa.String(length=6)))
+    add_column_online('olympics_medals', sa.Column('games_id', sa.Integer()))
+
+    # Existing rows are all from 1994 or later, where the year alone determines the season. This is
+    # a frozen SQL copy of ingest_olympics_medals_data.get_seasons, so the revision never changes.
+    backfill_in_batches('olympics_medals', 'season', "CASE WHEN year % 4 = 0 THEN 'summer' ELSE 'winter' END")
+
+    # Host cities are filled in by the next ingestion run
+    op.execute("INSERT INTO games (year, season) SELECT DISTINCT year, season FROM olympics_medals")
+    backfill_in_batches(
+        'olympics_medals', 'games_id',
+        "(SELECT g.id FROM games g WHERE g.year = olympics_medals.year AND g.season = olympics_medals.season)",
+    )
+
+    add_foreign_key_online('fk_olympics_medals_games_id', 'olympics_medals', 'games', ['games_id'], ['id'])
+    create_index_concurrently('ix_olympics_medals_season_year', 'olympics_medals', ['season', 'year'])
+
+
+def downgrade() -> None:
+    drop_index_concurrently('ix_olympics_medals_season_year', 'olympics_medals')
+    drop_foreign_key_online('fk_olympics_medals_games_id', 'olympics_medals')
+    drop_column_online('olympics_medals', 'games_id')
+    drop_column_online('olympics_medals', 'season')
+    op.drop_table('games')
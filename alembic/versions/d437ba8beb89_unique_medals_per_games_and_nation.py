@@ -0,0 +1,39 @@
+"""allow one olympics_medals row per games and nation
+
+Re-running ingestion used to insert every file again. The upgrade keeps only the latest copy
+of each (games_id, nation) row before adding the constraint; the deleted duplicates cannot be
+restored by the downgrade.
+
+Revision ID: d437ba8beb89
+Revises: 63b77243677d
+Create Date: 2026-10-19 14:26:08.318402
+
+"""
+from typing import Sequence, Union
+
+from schemas.online_migrations import (
+    add_unique_constraint_online,
+    delete_in_batches,
+    drop_unique_constraint_online,
+)
+
+# revision identifiers, used by Alembic.
+revision: str = 'd437ba8beb89'
+down_revision: Union[str, None] = '63b77243677d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Irreversible: a row is dropped when a newer row exists for the same Games and nation
+    delete_in_batches(
+        'olympics_medals',
+        "games_id IS NOT NULL AND EXISTS ("
+        "SELECT 1 FROM olympics_medals newer WHERE newer.games_id = olympics_medals.games_id "
+        "AND newer.nation = olympics_medals.nation AND newer.id > olympics_medals.id)",
+    )
+    add_unique_constraint_online('uq_olympics_medals_games_id_nation', 'olympics_medals', ['games_id', 'nation'])
+
+
+def downgrade() -> None:
+    drop_unique_constraint_online('uq_olympics_medals_games_id_nation', 'olympics_medals')
@@ -0,0 +1,95 @@
+import os
+
+import pandas as pd
+from dotenv import load_dotenv
+from sqlalchemy import create_engine
+
+from ingestion.ingest_olympics_medals_data import get_seasons
+
+GDP_PER_CAPITA_COLUMN = 'gdp_($_per_capita)'
+MEDAL_EFFICIENCY_TABLE = 'medal_efficiency'
+DEFAULT_WINDOW = 3
+
+
+def compute_medal_efficiency(df, window=DEFAULT_WINDOW):
+    """
+    Compute medal-efficiency metrics for every nation and Games in the merged dataset.
+    All metrics are computed with vectorized column arithmetic and grouped window passes,
+    never per nation or per year in Python.
+    :param df: Merged country/olympics DataFrame.
+    :param window: Number of Games to include in the rolling averages.
+    :return: DataFrame with one row per nation and Games.
+    """
+    result = df[['nation', 'year', 'gold', 'silver', 'bronze', 'total', 'population', GDP_PER_CAPITA_COLUMN]].copy()
+    result = result.rename(columns={GDP_PER_CAPITA_COLUMN: 'gdp_per_capita'})
+    result['season'] = df['season'] if 'season' in df.columns else get_seasons(df['year'])
+
+    # Per-capita and per-GDP ratios; missing or zero denominators yield NaN rather than inf
+    population = result['population'].where(result['population'] > 0)
+    gdp_billions = (result['gdp_per_capita'] * population / 1e9).where(lambda s: s > 0)
+    result['medals_per_million'] = result['total'] / population * 1e6
+    result['golds_per_million'] = result['gold'] / population * 1e6
+    result['medals_per_gdp_billion'] = result['total'] / gdp_billions
+
+    # Rank within each Games by total medals
+    result['medal_rank'] = (
+        result.groupby(['season', 'year'])['total'].rank(method='min', ascending=False).astype(int)
+    )
+
+    # Window passes run over each nation's history within a season, ordered by year
+    result = result.sort_values(['nation', 'season', 'year'], ignore_index=True)
+    history = result.groupby(['nation', 'season'], sort=False)
+    result['rolling_total_avg'] = (
+        history['total'].rolling(window, min_periods=1).mean().reset_index(level=[0, 1], drop=True)
+    )
+    result['rolling_medals_per_million_avg'] = (
+        history['medals_per_million'].rolling(window, min_periods=1).mean().reset_index(level=[0, 1], drop=True)
+    )
+    # Positive deltas mean the nation climbed the table since its previous Games of that season
+    result['rank_delta'] = history['medal_rank'].shift(1) - result['medal_rank']
+
+    # Summer vs winter split across each nation's full history
+    split = result.pivot_table(index='nation', columns='season', values='total', aggfunc='sum', fill_value=0)
+    split = split.reindex(columns=['summer', 'winter'], fill_value=0).add_suffix('_total').reset_index()
+    split.columns.name = None
+    split['summer_share'] = split['summer_total'] / (split['summer_total'] + split['winter_total']).where(
+        lambda s: s > 0
+    )
+    result = result.merge(split, on='nation', how='left')
+
+    return result
+
+
+def write_medal_efficiency(df, path, engine=None):
+    """
+    Persist the precomputed medal-efficiency table.
+    :param df: DataFrame returned by compute_medal_efficiency.
+    :param path: Destination Parquet file.
+    :param engine: Optional SQLAlchemy engine; when given the table is also written to the database.
+    :return: None
+    """
+    df.to_parquet(path, index=False)
+    print(f"Medal efficiency table saved to '{path}'.")
+    if engine is not None:
+        df.to_sql(MEDAL_EFFICIENCY_TABLE, con=engine, if_exists='replace', index=False)
+        print(f"Medal efficiency table written to '{MEDAL_EFFICIENCY_TABLE}'.")
+
+
+def main():
+    # Load environment variables from a .env file
+    load_dotenv()
+
+    artifact_path = os.getenv("MERGED_ARTIFACT_PATH", "merged_country_olympics_data.parquet")
+    output_path = os.getenv("MEDAL_EFFICIENCY_PATH", "medal_efficiency.parquet")
+
+    # The database copy is optional so the table can be built from the artifact alone
+    db_url = os.getenv("DATABASE_URL")
+    engine = create_engine(db_url, echo=False) if db_url else None
+
+    merged_df = pd.read_parquet(artifact_path)
+    efficiency_df = compute_medal_efficiency(merged_df)
+    write_medal_efficiency(efficiency_df, output_path, engine)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+import os
+import tempfile
+import unittest
+
+import pandas as pd
+from sqlalchemy import create_engine
+
+from analytics.medal_efficiency import compute_medal_efficiency, write_medal_efficiency
+
+
+class TestMedalEfficiency(unittest.TestCase):
+    def setUp(self):
+        self.df = pd.DataFrame({
+            'nation': ['usa', 'nor', 'usa', 'nor', 'usa', 'nor'],
+            'year': [2004, 2004, 2006, 2006, 2008, 2008],
+            'gold': [36, 0, 9, 2, 36, 3],
+            'silver': [39, 1, 9, 8, 38, 5],
+            'bronze': [26, 4, 7, 9, 36, 1],
+            'total': [101, 5, 25, 19, 110, 9],
+            'population': [300_000_000, 5_000_000, 300_000_000, 5_000_000, 300_000_000, 5_000_000],
+            'gdp_($_per_capita)': [40000.0, 50000.0, 40000.0, 50000.0, 40000.0, None],
+        })
+
+    def test_season_derived_from_year(self):
+        # Without a season column the season comes from the ingestion rule for the year
+        result = compute_medal_efficiency(self.df).set_index(['nation', 'year'])
+        self.assertEqual(result.loc[('nor', 2006), 'season'], 'winter')
+        self.assertEqual(result.loc[('usa', 2004), 'season'], 'summer')
+
+    def test_ratios(self):
+        result = compute_medal_efficiency(self.df).set_index(['nation', 'year'])
+        self.assertAlmostEqual(result.loc[('nor', 2006), 'medals_per_million'], 3.8)
+        self.assertAlmostEqual(result.loc[('usa', 2004), 'medals_per_gdp_billion'], 101 / 12000)
+        self.assertTrue(pd.isna(result.loc[('nor', 2008), 'medals_per_gdp_billion']))
+
+    def test_ranks_and_rolling_windows(self):
+        result = compute_medal_efficiency(self.df, window=2).set_index(['nation', 'year'])
+        self.assertEqual(result.loc[('nor', 2006), 'medal_rank'], 2)
+        self.assertEqual(result.loc[('usa', 2008), 'medal_rank'], 1)
+        # Rolling windows only span Games of the same season
+        self.assertAlmostEqual(result.loc[('usa', 2008), 'rolling_total_avg'], 105.5)
+        self.assertAlmostEqual(result.loc[('usa', 2006), 'rolling_total_avg'], 25)
+        self.assertEqual(result.loc[('nor', 2008), 'rank_delta'], 0)
+        self.assertTrue(pd.isna(result.loc[('nor', 2004), 'rank_delta']))
+
+    def test_summer_winter_split(self):
+        result = compute_medal_efficiency(self.df).set_index(['nation', 'year'])
+        self.assertEqual(result.loc[('nor', 2004), 'summer_total'], 14)
+        self.assertEqual(result.loc[('nor', 2004), 'winter_total'], 19)
+        self.assertAlmostEqual(result.loc[('usa', 2006), 'summer_share'], 211 / 236)
+
+    def test_season_column_takes_precedence(self):
+        df = self.df.assign(season='summer')
+        result = compute_medal_efficiency(df)
+        self.assertTrue((result['winter_total'] == 0).all())
+
+    def test_write_medal_efficiency(self):
+        result = compute_medal_efficiency(self.df)
+        engine = create_engine("sqlite:///:memory:")
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "medal_efficiency.parquet")
+            write_medal_efficiency(result, path, engine)
+            self.assertEqual(len(pd.read_parquet(path)), len(result))
+        self.assertEqual(len(pd.read_sql_table('medal_efficiency', engine)), len(result))
+
+
+if __name__ == "__main__":
+    unittest.main()
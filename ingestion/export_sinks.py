@@ -0,0 +1,326 @@
+import gzip
+import os
+import queue
+import shutil
+import threading
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sqlalchemy import inspect, text
+
+DEFAULT_BATCH_SIZE = 50000
+DEFAULT_QUEUE_SIZE = 4
+DEFAULT_FORMATS = 'csv,parquet,partitioned_parquet'
+
+_END_OF_STREAM = object()
+_ABORT = object()  # Sent instead of _END_OF_STREAM when the producer fails
+
+
+def open_text(path, compression=None):
+    if compression == 'gzip':
+        return gzip.open(path, mode='wt', encoding='utf-8', newline='')
+    return open(path, mode='w', encoding='utf-8', newline='')
+
+
+def arrow_schema(df):
+    """
+    Arrow schema for a stream of batches, derived from the frame's dtypes rather than its
+    values. Columns holding no typed values (e.g. all-None object columns) would infer as
+    the null type and reject every later batch, so they are written as strings.
+    """
+    schema = pa.Schema.from_pandas(df.iloc[:0], preserve_index=False)
+    for index, field in enumerate(schema):
+        if pa.types.is_null(field.type):
+            schema = schema.set(index, field.with_type(pa.string()))
+    return schema
+
+
+def remove_path(path):
+    if os.path.isdir(path):
+        shutil.rmtree(path)
+    elif os.path.exists(path):
+        os.remove(path)
+
+
+class CsvSink:
+    """
+    Streams batches into a single CSV file, writing the header with the first batch.
+    The file is written under a temporary name and only replaces `path` on close.
+    """
+
+    def __init__(self, path, compression=None):
+        self.path = path
+        self.compression = compression
+        self._file = None
+
+    def write_batch(self, df):
+        header = self._file is None
+        if header:
+            self._file = open_text(f"{self.path}.tmp", self.compression)
+        df.to_csv(self._file, index=False, header=header)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            os.replace(f"{self.path}.tmp", self.path)
+            print(f"Merged data saved to '{self.path}'.")
+
+    def abort(self):
+        if self._file is not None:
+            self._file.close()
+            remove_path(f"{self.path}.tmp")
+
+
+class JsonLinesSink:
+    """
+    Streams batches into a JSON lines file, one record per line.
+    The file is written under a temporary name and only replaces `path` on close.
+    """
+
+    def __init__(self, path, compression=None):
+        self.path = path
+        self.compression = compression
+        self._file = None
+
+    def write_batch(self, df):
+        if self._file is None:
+            self._file = open_text(f"{self.path}.tmp", self.compression)
+        if len(df):
+            self._file.write(df.to_json(orient='records', lines=True))
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            os.replace(f"{self.path}.tmp", self.path)
+            print(f"Merged data saved to '{self.path}'.")
+
+    def abort(self):
+        if self._file is not None:
+            self._file.close()
+            remove_path(f"{self.path}.tmp")
+
+
+class ParquetSink:
+    """
+    Streams batches into a single Parquet file; the schema is fixed by the first batch's dtypes.
+    The file is written under a temporary name and only replaces `path` on close.
+    """
+
+    def __init__(self, path, compression='snappy', row_group_size=None):
+        self.path = path
+        self.compression = compression
+        self.row_group_size = row_group_size
+        self._writer = None
+
+    def write_batch(self, df):
+        if self._writer is None:
+            self._writer = pq.ParquetWriter(f"{self.path}.tmp", arrow_schema(df), compression=self.compression)
+        table = pa.Table.from_pandas(df, schema=self._writer.schema, preserve_index=False)
+        self._writer.write_table(table, row_group_size=self.row_group_size)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            os.replace(f"{self.path}.tmp", self.path)
+            print(f"Merged data saved to '{self.path}'.")
+
+    def abort(self):
+        if self._writer is not None:
+            self._writer.close()
+            remove_path(f"{self.path}.tmp")
+
+
+class PartitionedParquetSink:
+    """
+    Streams batches into a Parquet dataset with one directory per partition value
+    (e.g. `season=winter/`). The dataset is built in a temporary directory and replaces
+    any previous dataset at the path only on close.
+    """
+
+    def __init__(self, path, partition_cols=('season',), compression='snappy', row_group_size=None):
+        self.path = path
+        self.partition_cols = list(partition_cols)
+        self.compression = compression
+        self.row_group_size = row_group_size
+        self._batches = 0
+        self._schema = None  # Shared by every partition file, fixed by the first batch's dtypes
+
+    def write_batch(self, df):
+        if self._batches == 0:
+            remove_path(f"{self.path}.tmp")  # Left behind by an interrupted run
+            self._schema = arrow_schema(df)
+        pq.write_to_dataset(
+            pa.Table.from_pandas(df, schema=self._schema, preserve_index=False),
+            f"{self.path}.tmp",
+            partition_cols=self.partition_cols,
+            basename_template=f"part-{self._batches}-{{i}}.parquet",
+            compression=self.compression,
+            row_group_size=self.row_group_size,
+        )
+        self._batches += 1
+
+    def close(self):
+        if self._batches:
+            # Directories cannot be replaced in one rename, so move the old dataset aside first
+            if os.path.exists(self.path):
+                os.replace(self.path, f"{self.path}.old")
+            os.replace(f"{self.path}.tmp", self.path)
+            remove_path(f"{self.path}.old")
+            print(f"Merged data saved to '{self.path}/' partitioned by {', '.join(self.partition_cols)}.")
+
+    def abort(self):
+        remove_path(f"{self.path}.tmp")
+
+
+class SqlTableSink:
+    """
+    Streams batches into a staging table that replaces (or is appended to) the target
+    table on close, so readers never see a partially written table.
+    """
+
+    def __init__(self, engine, table_name, if_exists='replace', chunksize=None):
+        self.engine = engine
+        self.table_name = table_name
+        self.if_exists = if_exists
+        self.chunksize = chunksize
+        self._written = False
+
+    @property
+    def staging_name(self):
+        return f"{self.table_name}__staging"
+
+    def write_batch(self, df):
+        if_exists = 'append' if self._written else 'replace'
+        df.to_sql(self.staging_name, con=self.engine, if_exists=if_exists, index=False, chunksize=self.chunksize)
+        self._written = True
+
+    def close(self):
+        if not self._written:
+            return
+        quote = self.engine.dialect.identifier_preparer.quote
+        staging, target = quote(self.staging_name), quote(self.table_name)
+        with self.engine.begin() as connection:
+            exists = inspect(connection).has_table(self.table_name)
+            if exists and self.if_exists == 'fail':
+                raise ValueError(f"Table '{self.table_name}' already exists.")
+            if exists and self.if_exists == 'append':
+                connection.execute(text(f"INSERT INTO {target} SELECT * FROM {staging}"))
+                connection.execute(text(f"DROP TABLE {staging}"))
+            else:
+                connection.execute(text(f"DROP TABLE IF EXISTS {target}"))
+                connection.execute(text(f"ALTER TABLE {staging} RENAME TO {target}"))
+        print(f"Merged data written to table '{self.table_name}'.")
+
+    def abort(self):
+        if self._written:
+            staging = self.engine.dialect.identifier_preparer.quote(self.staging_name)
+            with self.engine.begin() as connection:
+                connection.execute(text(f"DROP TABLE IF EXISTS {staging}"))
+
+
+def iter_batches(df, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Slice an in-memory DataFrame into record batches.
+    """
+    for start in range(0, len(df), batch_size):
+        yield df.iloc[start:start + batch_size]
+
+
+def _is_end(batch):
+    return batch is _END_OF_STREAM or batch is _ABORT
+
+
+def _consume(sink, batches, errors):
+    batch = None
+    try:
+        while not _is_end(batch := batches.get()):
+            sink.write_batch(batch)
+        if batch is _END_OF_STREAM:
+            sink.close()
+        else:
+            sink.abort()
+    except Exception as e:
+        errors.append(e)
+        # Keep draining so the producer never blocks on a failed sink
+        while not _is_end(batch):
+            batch = batches.get()
+        try:
+            sink.abort()
+        except Exception:
+            pass  # The original error is the one worth reporting
+
+
+def export_batches(batches, sinks, queue_size=DEFAULT_QUEUE_SIZE):
+    """
+    Feed one stream of record batches to every sink concurrently. Each sink runs in its own
+    thread behind a bounded queue, so total time tracks the slowest sink and at most
+    `queue_size` batches per sink are held in memory. If the batches raise, every sink
+    discards its partial output and previous outputs are left untouched.
+    :param batches: Iterable of DataFrames sharing the same columns.
+    :param sinks: Sink objects exposing write_batch(df), close() and abort().
+    :param queue_size: Maximum number of batches buffered per sink.
+    :return: Number of rows exported.
+    """
+    queues = [queue.Queue(maxsize=queue_size) for _ in sinks]
+    errors = []
+    threads = [
+        threading.Thread(target=_consume, args=(sink, batch_queue, errors), daemon=True)
+        for sink, batch_queue in zip(sinks, queues)
+    ]
+    for thread in threads:
+        thread.start()
+
+    rows = 0
+    end_of_stream = _ABORT
+    try:
+        for batch in batches:
+            rows += len(batch)
+            for batch_queue in queues:
+                batch_queue.put(batch)
+        end_of_stream = _END_OF_STREAM
+    finally:
+        for batch_queue in queues:
+            batch_queue.put(end_of_stream)
+        for thread in threads:
+            thread.join()
+
+    if errors:
+        raise errors[0]
+    return rows
+
+
+def sinks_from_env(engine=None, base_name='merged_country_olympics_data'):
+    """
+    Build the export sinks selected by the EXPORT_* environment variables.
+    :param engine: SQLAlchemy engine used when EXPORT_TABLE is set.
+    :param base_name: File name stem shared by the file outputs.
+    :return: List of sinks.
+    """
+    export_dir = os.getenv("EXPORT_DIR", ".")
+    formats = [fmt.strip() for fmt in os.getenv("EXPORT_FORMATS", DEFAULT_FORMATS).split(',') if fmt.strip()]
+    text_compression = os.getenv("EXPORT_TEXT_COMPRESSION") or None
+    parquet_compression = os.getenv("PARQUET_COMPRESSION", "snappy")
+    row_group_size = int(os.getenv("PARQUET_ROW_GROUP_SIZE")) if os.getenv("PARQUET_ROW_GROUP_SIZE") else None
+    suffix = '.gz' if text_compression == 'gzip' else ''
+
+    os.makedirs(export_dir, exist_ok=True)
+    path = os.path.join(export_dir, base_name)
+    factories = {
+        'csv': lambda: CsvSink(f"{path}.csv{suffix}", text_compression),
+        'jsonl': lambda: JsonLinesSink(f"{path}.jsonl{suffix}", text_compression),
+        'parquet': lambda: ParquetSink(f"{path}.parquet", parquet_compression, row_group_size),
+        'partitioned_parquet': lambda: PartitionedParquetSink(
+            f"{path}_by_season", ('season',), parquet_compression, row_group_size
+        ),
+    }
+
+    unknown = set(formats) - set(factories)
+    if unknown:
+        raise ValueError(f"Unknown export formats: {', '.join(sorted(unknown))}")
+    sinks = [factories[fmt]() for fmt in formats]
+
+    table_name = os.getenv("EXPORT_TABLE")
+    if table_name:
+        sinks.append(SqlTableSink(engine, table_name))
+
+    return sinks
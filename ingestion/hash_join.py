@@ -0,0 +1,132 @@
+import itertools
+import math
+import os
+import shutil
+import tempfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+DEFAULT_MAX_WORKERS = min(4, os.cpu_count() or 1)
+
+
+def partition_ids(keys, num_partitions):
+    """
+    Assign each key to a partition. pandas' object hashing is deterministic, so equal keys
+    from either side of the join always land in the same partition.
+    """
+    return pd.util.hash_pandas_object(keys, index=False).to_numpy() % num_partitions
+
+
+def partitions_for_budget(estimated_bytes, memory_budget, max_workers=DEFAULT_MAX_WORKERS, output_bytes=None,
+                          buffered_outputs=0):
+    """
+    Choose a partition count so everything held in memory at once fits the budget: each
+    worker holds one left and one right partition plus their joined output, and consumers
+    may buffer further joined partitions (e.g. export queues) while workers run.
+    :param estimated_bytes: Estimated in-memory size of both inputs combined.
+    :param memory_budget: Memory budget in bytes for the join phase.
+    :param max_workers: Number of partitions joined in parallel.
+    :param output_bytes: Estimated size of the whole joined output; defaults to the input size.
+    :param buffered_outputs: Joined partitions the consumer may hold besides the workers'.
+    :return: Number of partitions.
+    """
+    output_bytes = estimated_bytes if output_bytes is None else output_bytes
+    total_bytes = max_workers * (estimated_bytes + output_bytes) + buffered_outputs * output_bytes
+    return max(1, math.ceil(total_bytes / memory_budget))
+
+
+def estimate_bytes(chunks, row_count):
+    """
+    Estimate a table's in-memory size from its first chunk and total row count.
+    :return: Tuple of (estimated bytes, iterator yielding every chunk including the first).
+    """
+    chunks = iter(chunks)
+    first = next(chunks, None)
+    if first is None or first.empty:
+        return 0, iter(() if first is None else (first,))
+    row_bytes = first.memory_usage(deep=True).sum() / len(first)
+    return int(row_bytes * row_count), itertools.chain((first,), chunks)
+
+
+class SpilledPartitions:
+    """
+    One side of a join, hash-partitioned by key and spilled to local disk as Parquet files.
+    """
+
+    def __init__(self, directory, num_partitions):
+        self.directory = directory
+        self.num_partitions = num_partitions
+        self.empty = None  # Zero-row frame preserving columns and dtypes
+        self._chunks = 0
+        for partition in range(num_partitions):
+            os.makedirs(self.partition_path(partition), exist_ok=True)
+
+    def partition_path(self, partition):
+        return os.path.join(self.directory, f"part-{partition}")
+
+    def add(self, df, key):
+        if self.empty is None:
+            self.empty = df.iloc[:0]
+        if df.empty:
+            return
+        for partition, part in df.groupby(partition_ids(df[key], self.num_partitions), sort=False):
+            part.to_parquet(os.path.join(self.partition_path(partition), f"chunk-{self._chunks}.parquet"), index=False)
+        self._chunks += 1
+
+    def read(self, partition):
+        path = self.partition_path(partition)
+        files = sorted(os.listdir(path))
+        if not files:
+            return self.empty
+        return pd.concat([pd.read_parquet(os.path.join(path, name)) for name in files], ignore_index=True)
+
+
+def hash_join(left_chunks, right_chunks, left_on, right_on, num_partitions, spill_dir=None,
+              max_workers=DEFAULT_MAX_WORKERS):
+    """
+    Inner join two streams of DataFrames without holding either side in memory. Both sides are
+    partitioned by hashed key and spilled to disk, then matching partitions are joined one
+    pair at a time on a small thread pool.
+    :param left_chunks: Iterable of DataFrames for the left side.
+    :param right_chunks: Iterable of DataFrames for the right side.
+    :param left_on: Join key column on the left side.
+    :param right_on: Join key column on the right side.
+    :param num_partitions: Number of hash partitions; see partitions_for_budget.
+    :param spill_dir: Directory for spill files; defaults to the system temp directory.
+    :param max_workers: Number of partitions joined in parallel.
+    :return: Generator of joined DataFrames, one per non-empty partition.
+    """
+    workdir = tempfile.mkdtemp(prefix='hash_join-', dir=spill_dir)
+    try:
+        left = SpilledPartitions(os.path.join(workdir, 'left'), num_partitions)
+        for chunk in left_chunks:
+            left.add(chunk, left_on)
+        right = SpilledPartitions(os.path.join(workdir, 'right'), num_partitions)
+        for chunk in right_chunks:
+            right.add(chunk, right_on)
+        # An inner join with an empty side has no rows
+        if left.empty is None or right.empty is None:
+            return
+
+        def join_partition(partition):
+            return pd.merge(
+                left.read(partition), right.read(partition), left_on=left_on, right_on=right_on, how='inner'
+            )
+
+        # Keep at most max_workers partitions in flight so finished results never pile up
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            pending = deque()
+            for partition in range(num_partitions):
+                pending.append(executor.submit(join_partition, partition))
+                if len(pending) >= max_workers:
+                    joined = pending.popleft().result()
+                    if not joined.empty:
+                        yield joined
+            while pending:
+                joined = pending.popleft().result()
+                if not joined.empty:
+                    yield joined
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
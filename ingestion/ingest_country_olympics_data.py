@@ -1,26 +1,38 @@
 import pandas as pd
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, text
 from dotenv import load_dotenv
 import os
 
+from ingestion.export_sinks import DEFAULT_BATCH_SIZE, DEFAULT_QUEUE_SIZE, export_batches, iter_batches, sinks_from_env
+from ingestion.hash_join import DEFAULT_MAX_WORKERS, estimate_bytes, hash_join, partitions_for_budget
+from ingestion.ingest_noc_mapping_data import get_noc_lookup
+from ingestion.source_table_cache import DEFAULT_CACHE_DIR, DEFAULT_MAX_BYTES, SourceTableCache
 
-def load_and_merge_data(engine):
-    """
-    Load the noc_mapping, countries, and olympics_medals tables into memory via pandas,
-    merge them into one DataFrame, and save as a CSV & Parquet file.
-    """
-    # Load tables into pandas DataFrames
-    noc_mapping_df = pd.read_sql_table('noc_mapping', engine)
-    countries_df = pd.read_sql_table('countries', engine)
-    olympics_medals_df = pd.read_sql_table('olympics_medals', engine)
+DEFAULT_CHUNKSIZE = 100000
 
-    # Normalize and map data
+
+def normalize_noc_mapping(noc_mapping_df):
     noc_mapping_df['noc_code'] = noc_mapping_df['noc_code'].str.lower().str.strip()
+    # Normalize 'country_name' for consistent matching against the countries table
+    noc_mapping_df['country_name'] = noc_mapping_df['country_name'].str.lower().str.strip()
+    return noc_mapping_df
+
+
+def normalize_countries(countries_df):
     countries_df['country'] = countries_df['country'].str.lower().str.strip()
+    return countries_df
+
+
+def normalize_olympics_medals(olympics_medals_df):
     olympics_medals_df['nation'] = olympics_medals_df['nation'].str.lower().str.strip()
+    return olympics_medals_df
+
 
-    # Join olympics medals with NOC mapping on NOC code and nation
-    olympics_noc_df = pd.merge(
+def join_medals_to_noc(olympics_medals_df, noc_mapping_df):
+    """
+    Join olympics medals with NOC mapping on NOC code and nation.
+    """
+    return pd.merge(
         olympics_medals_df,
         noc_mapping_df,
         left_on='nation',
@@ -28,11 +40,11 @@ def load_and_merge_data(engine):
         how='inner'
     )
 
-    # Normalize 'country_name' and 'country' for consistent matching
-    olympics_noc_df['country_name'] = olympics_noc_df['country_name'].str.lower().str.strip()
-    countries_df['country'] = countries_df['country'].str.lower().str.strip()
 
-    # Join with countries on normalized country name
+def join_countries(olympics_noc_df, countries_df):
+    """
+    Join NOC-mapped medals with countries on normalized country name.
+    """
     final_df = pd.merge(
         olympics_noc_df,
         countries_df,
@@ -41,8 +53,45 @@ def load_and_merge_data(engine):
         how='inner'
     )
 
-    # Preserve noc_mapping_id
-    final_df['noc_mapping_id'] = noc_mapping_df['id']  # Ensure the correct NOCMapping ID is included
+    return add_noc_mapping_id(final_df)
+
+
+def add_noc_mapping_id(final_df):
+    # Preserve the id of the NOC mapping row each medal row was matched to
+    final_df['noc_mapping_id'] = final_df['id_y']
+    return final_df
+
+
+def merge_source_frames(olympics_medals_df, noc_mapping_df, countries_df):
+    """
+    Denormalize already-normalized source frames into the merged artifact layout.
+    """
+    return join_countries(join_medals_to_noc(olympics_medals_df, noc_mapping_df), countries_df)
+
+
+def read_source_table(table_name, engine, normalize, cache=None):
+    """
+    Read and normalize a source table, going through the on-disk cache when one is given.
+    """
+    if cache is None:
+        return normalize(pd.read_sql_table(table_name, engine))
+    return cache.read_table(table_name, engine, normalize)
+
+
+def load_and_merge_data(engine, cache=None):
+    """
+    Load the noc_mapping, countries, and olympics_medals tables into memory via pandas,
+    merge them into one DataFrame, and save as a CSV & Parquet file.
+    :param engine: SQLAlchemy engine connected to the source database.
+    :param cache: Optional SourceTableCache; unchanged tables are then read from local disk.
+    """
+    # Load and normalize tables into pandas DataFrames
+    noc_mapping_df = read_source_table('noc_mapping', engine, normalize_noc_mapping, cache)
+    countries_df = read_source_table('countries', engine, normalize_countries, cache)
+    olympics_medals_df = read_source_table('olympics_medals', engine, normalize_olympics_medals, cache)
+
+    olympics_noc_df = join_medals_to_noc(olympics_medals_df, noc_mapping_df)
+    final_df = join_countries(olympics_noc_df, countries_df)
 
     # Debugging prints
     print("Olympics NOC DataFrame:")
@@ -57,6 +106,78 @@ def load_and_merge_data(engine):
     return final_df
 
 
+def stream_merged_data(engine, memory_budget, spill_dir=None, max_workers=DEFAULT_MAX_WORKERS,
+                       chunksize=DEFAULT_CHUNKSIZE, buffered_batches=0):
+    """
+    Out-of-core variant of load_and_merge_data that yields the merged artifact in batches.
+    The small noc_mapping table is broadcast to each medals chunk; the result and the
+    countries table are then hash-partitioned on the country key, spilled to disk and
+    joined one partition at a time, so memory stays within the budget.
+    :param engine: SQLAlchemy engine connected to the source database.
+    :param memory_budget: Memory budget in bytes for the join.
+    :param spill_dir: Directory for spill files.
+    :param max_workers: Number of partitions joined in parallel.
+    :param chunksize: Rows read from the database per chunk.
+    :param buffered_batches: Merged batches the consumer may hold at once, counted against the budget.
+    :return: Generator of merged DataFrames.
+    """
+    noc_mapping_df = normalize_noc_mapping(get_noc_lookup(engine).to_frame())
+
+    with engine.connect() as connection:
+        medals_rows = connection.execute(text("SELECT COUNT(*) FROM olympics_medals")).scalar()
+        countries_rows = connection.execute(text("SELECT COUNT(*) FROM countries")).scalar()
+
+    medals_bytes, medals_chunks = estimate_bytes(
+        (
+            join_medals_to_noc(normalize_olympics_medals(chunk), noc_mapping_df)
+            for chunk in pd.read_sql_table('olympics_medals', engine, chunksize=chunksize)
+        ),
+        medals_rows,
+    )
+    countries_bytes, countries_chunks = estimate_bytes(
+        (normalize_countries(chunk) for chunk in pd.read_sql_table('countries', engine, chunksize=chunksize)),
+        countries_rows,
+    )
+    # Every medal row gains the country columns, so the output outgrows the medals input
+    countries_row_bytes = countries_bytes / countries_rows if countries_rows else 0
+    output_bytes = medals_bytes + int(medals_rows * countries_row_bytes)
+    num_partitions = partitions_for_budget(
+        medals_bytes + countries_bytes, memory_budget, max_workers, output_bytes, buffered_batches
+    )
+
+    for joined in hash_join(
+        medals_chunks, countries_chunks, 'country_name', 'country', num_partitions, spill_dir, max_workers
+    ):
+        yield add_noc_mapping_id(joined)
+
+
+def write_season_partitioned_parquet(df, path):
+    """
+    Write the merged data as a Parquet dataset with one directory per season
+    (e.g. `season=winter/`), replacing any previous contents of those partitions.
+    :param df: Merged DataFrame containing a season column.
+    :param path: Root directory of the dataset.
+    :return: None
+    """
+    df.to_parquet(path, index=False, partition_cols=['season'], existing_data_behavior='delete_matching')
+
+
+def read_merged_data(path, season=None):
+    """
+    Read the season-partitioned merged dataset. When a season is given only that
+    season's partition is opened; the other half of the data is never read.
+    :param path: Root directory written by write_season_partitioned_parquet.
+    :param season: Optional 'summer' or 'winter'.
+    :return: A Pandas DataFrame.
+    """
+    filters = [('season', '==', season)] if season else None
+    df = pd.read_parquet(path, filters=filters)
+    # Partition values come back as a categorical; restore a plain string column
+    df['season'] = df['season'].astype(str)
+
+    return df
+
+
 def main():
     # Load environment variables from a .env file
     load_dotenv()
@@ -65,15 +186,34 @@ def main():
     db_url = os.getenv("DATABASE_URL")
     engine = create_engine(db_url, echo=False)  # Disable SQL logging for cleaner output
 
-    # Load, merge, and save data
-    merged_data = load_and_merge_data(engine)
-    if merged_data.empty:
-        print("The resulting dataset is empty. Check data consistency or missing NOC mappings.")
+    sinks = sinks_from_env(engine)
+    memory_budget = os.getenv("MERGE_MEMORY_BUDGET_BYTES")
+    if memory_budget:
+        # Join out of core within the memory budget, streaming partitions straight to the outputs.
+        # Each sink queues up to DEFAULT_QUEUE_SIZE batches and the producer holds one more.
+        batches = stream_merged_data(
+            engine,
+            int(memory_budget),
+            spill_dir=os.getenv("MERGE_SPILL_DIR"),
+            max_workers=int(os.getenv("MERGE_MAX_WORKERS", DEFAULT_MAX_WORKERS)),
+            chunksize=int(os.getenv("MERGE_CHUNKSIZE", DEFAULT_CHUNKSIZE)),
+            buffered_batches=DEFAULT_QUEUE_SIZE * len(sinks) + 1,
+        )
     else:
-        merged_data.to_csv('merged_country_olympics_data.csv', index=False)
-        print("Merged data saved to 'merged_country_olympics_data.csv'.")
-        merged_data.to_parquet('merged_country_olympics_data.parquet', index=False)
-        print("Merged data saved to 'merged_country_olympics_data.parquet'.")
+        # Reuse locally cached source tables whose fingerprints have not changed
+        cache = SourceTableCache(
+            os.getenv("SOURCE_CACHE_DIR", DEFAULT_CACHE_DIR),
+            int(os.getenv("SOURCE_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES)),
+        )
+
+        # Load and merge data in memory
+        merged_data = load_and_merge_data(engine, cache)
+        batches = iter_batches(merged_data, int(os.getenv("EXPORT_BATCH_SIZE", DEFAULT_BATCH_SIZE)))
+
+    # Stream the merged data to every configured output concurrently
+    rows = export_batches(batches, sinks, queue_size=DEFAULT_QUEUE_SIZE)
+    if rows == 0:
+        print("The resulting dataset is empty. Check data consistency or missing NOC mappings.")
 
 
 if __name__ == "__main__":
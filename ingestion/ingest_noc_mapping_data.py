@@ -0,0 +1,211 @@
+import hashlib
+import os
+import threading
+import time
+from types import MappingProxyType
+
+import pandas as pd
+from dotenv import load_dotenv
+from sqlalchemy import create_engine, delete, insert, select
+
+from schemas.noc_mapping_schema import Base, NOCMapping
+
+DEFAULT_MAX_STALENESS = 30.0
+
+
+def create_noc_mapping_dataframe(file_path):
+    """
+    Create a dataframe from the CSV file containing the NOC reference data.
+    :param file_path: Path to the CSV file with id, noc_code and country_name columns.
+    :return: A Pandas DataFrame containing the data.
+    """
+    df = pd.read_csv(file_path, dtype={'id': 'int64', 'noc_code': 'str', 'country_name': 'str'})
+    df['noc_code'] = df['noc_code'].str.strip().str.upper()
+    df['country_name'] = df['country_name'].str.strip()
+
+    return df
+
+
+def validate_noc_mapping(df):
+    """
+    Check the NOC reference data before it is loaded.
+    Codes must be unique 3-letter codes and ids unique; several codes may share a country
+    (e.g. historic or alternate codes).
+    :param df: DataFrame returned by create_noc_mapping_dataframe.
+    :return: None
+    :raises ValueError: describing every problem found.
+    """
+    problems = []
+    duplicated_codes = sorted(df.loc[df['noc_code'].duplicated(), 'noc_code'].unique())
+    if duplicated_codes:
+        problems.append(f"duplicate NOC codes: {', '.join(duplicated_codes)}")
+    duplicated_ids = sorted(df.loc[df['id'].duplicated(), 'id'].unique())
+    if duplicated_ids:
+        problems.append(f"duplicate ids: {', '.join(map(str, duplicated_ids))}")
+    malformed = sorted(df.loc[~df['noc_code'].str.fullmatch(r'[A-Z]{3}', na=False), 'noc_code'].astype(str))
+    if malformed:
+        problems.append(f"malformed NOC codes: {', '.join(malformed)}")
+    if df['country_name'].isna().any() or (df['country_name'] == '').any():
+        problems.append("missing country names")
+
+    if problems:
+        raise ValueError(f"Invalid NOC mapping data: {'; '.join(problems)}")
+
+
+def upsert_statement(engine):
+    """
+    Bulk insert statement that updates existing rows by id on PostgreSQL and SQLite.
+    """
+    table = NOCMapping.__table__
+    if engine.dialect.name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif engine.dialect.name == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        return insert(table)
+
+    statement = dialect_insert(table)
+    return statement.on_conflict_do_update(
+        index_elements=[table.c.id],
+        set_={'noc_code': statement.excluded.noc_code, 'country_name': statement.excluded.country_name},
+    )
+
+
+def upsert_noc_mapping_data(df, engine):
+    """
+    Make the noc_mapping table match the reference data in one transaction. Rows whose
+    (id, noc_code) pair is not in the data are deleted first, which covers both codes
+    dropped from the CSV and codes moved to a different id; the rest are upserted by id.
+    :param df: Validated DataFrame of NOC mappings.
+    :param engine: SQLAlchemy engine connected to the target database.
+    :return: None
+    :raises sqlalchemy.exc.SQLAlchemyError: if the load fails; nothing is changed in that case.
+    """
+    table = NOCMapping.__table__
+    records = df[['id', 'noc_code', 'country_name']].to_dict('records')
+    wanted = {(record['id'], record['noc_code']) for record in records}
+    with engine.begin() as connection:
+        existing = connection.execute(select(table.c.id, table.c.noc_code)).all()
+        stale = [noc_id for noc_id, noc_code in existing if (noc_id, noc_code) not in wanted]
+        if stale:
+            connection.execute(delete(table).where(table.c.id.in_(stale)))
+        connection.execute(upsert_statement(engine), records)
+    print(f"{len(records)} NOC mappings upserted successfully, {len(stale)} stale mappings removed!")
+
+
+class NOCLookup:
+    """
+    Immutable in-memory view of the noc_mapping table resolving a NOC code to its id and
+    country name.
+    """
+
+    def __init__(self, rows, version):
+        self.version = version
+        self._by_code = MappingProxyType({
+            noc_code.strip().upper(): (noc_id, country_name) for noc_id, noc_code, country_name in rows
+        })
+
+    def __contains__(self, noc_code):
+        return noc_code.strip().upper() in self._by_code
+
+    def __len__(self):
+        return len(self._by_code)
+
+    def resolve(self, noc_code):
+        """
+        :return: (id, country_name) for the code, or None when it is unknown.
+        """
+        return self._by_code.get(noc_code.strip().upper())
+
+    def id_for(self, noc_code):
+        entry = self.resolve(noc_code)
+        return entry[0] if entry else None
+
+    def name_for(self, noc_code):
+        entry = self.resolve(noc_code)
+        return entry[1] if entry else None
+
+    def to_frame(self):
+        """
+        Rebuild the table as a DataFrame with the same columns as read_sql_table('noc_mapping').
+        """
+        return pd.DataFrame(
+            [(noc_id, noc_code, country_name) for noc_code, (noc_id, country_name) in self._by_code.items()],
+            columns=['id', 'noc_code', 'country_name'],
+        )
+
+
+_lookups = {}  # (lookup, time of last version check) per database URL
+_lookups_lock = threading.Lock()
+
+
+def read_noc_rows(engine):
+    table = NOCMapping.__table__
+    with engine.connect() as connection:
+        return connection.execute(
+            select(table.c.id, table.c.noc_code, table.c.country_name).order_by(table.c.id)
+        ).all()
+
+
+def rows_version(rows):
+    """
+    Content hash of the mapping rows; the table is small enough to hash on every check.
+    """
+    return hashlib.sha1(repr([tuple(row) for row in rows]).encode()).hexdigest()[:16]
+
+
+def load_noc_lookup(engine):
+    rows = read_noc_rows(engine)
+    return NOCLookup(rows, rows_version(rows))
+
+
+def get_noc_lookup(engine, max_staleness=DEFAULT_MAX_STALENESS):
+    """
+    Return the process-wide NOC lookup for a database, loading it on first use.
+    The table is re-read at most every `max_staleness` seconds and the lookup is only
+    rebuilt when the rows' content hash has changed, so resolution is normally a dict hit.
+    :param engine: SQLAlchemy engine connected to the database holding noc_mapping.
+    :param max_staleness: Seconds between version checks.
+    :return: A NOCLookup.
+    """
+    key = engine.url.render_as_string(hide_password=False)
+    with _lookups_lock:
+        cached = _lookups.get(key)
+        now = time.monotonic()
+        if cached is not None and now - cached[1] < max_staleness:
+            return cached[0]
+
+        rows = read_noc_rows(engine)
+        version = rows_version(rows)
+        lookup = cached[0] if cached is not None and cached[0].version == version else NOCLookup(rows, version)
+        _lookups[key] = (lookup, now)
+        return lookup
+
+
+def clear_noc_lookups():
+    with _lookups_lock:
+        _lookups.clear()
+
+
+def main():
+    # Load environment variables from a .env file to get DB credentials and other settings
+    load_dotenv()
+
+    # Connect to the database using credentials from the environment variables
+    db_url = os.getenv("DATABASE_URL")
+    engine = create_engine(db_url, echo=True)  # Enable echo for SQL statement logging
+
+    # Ensure that the table is created in the database
+    Base.metadata.create_all(engine)
+
+    # Load and validate the NOC reference data from the CSV file
+    file_path = os.getenv("NOC_MAPPING_DATASET")
+    df = create_noc_mapping_dataframe(file_path)
+    validate_noc_mapping(df)
+
+    # Upsert the NOC reference data into the database
+    upsert_noc_mapping_data(df, engine)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,26 @@
 import os
-import csv
-from sqlalchemy import create_engine
+from collections import namedtuple
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+from sqlalchemy import create_engine, insert
 from sqlalchemy.orm import sessionmaker
 from dotenv import load_dotenv
+from schemas.games_schema import Games, Base as GamesBase
 from schemas.olympics_medals_schema import OlympicsMedals, Base
 
+# Summer and winter Games have been held in alternating even years since 1994
+FIRST_ALTERNATING_YEAR = 1994
+
+# Medal count columns in the source CSV files and their names in olympics_medals
+MEDAL_COLUMNS = {'Gold': 'gold', 'Silver': 'silver', 'Bronze': 'bronze', 'Total': 'total'}
+
+# One file's medal table as typed columns: `nation` is a pyarrow string array and the others NumPy
+# int64 arrays; `games` is the dict from get_games_from_filename
+MedalsBatch = namedtuple('MedalsBatch', ['games', 'nation', 'year', 'gold', 'silver', 'bronze', 'total'])
+
 
 def get_year_from_filename(filename):
     """
@@ -20,18 +36,199 @@ def get_year_from_filename(filename):
     return year
 
 
-def load_datasets(datasets_path):
+def get_host_from_filename(filename):
+    """
+    Extract the host city from the filename given known file patterns.
+    :param filename:
+    :return: host city extracted from the filename, e.g. 'Lillehammer' or 'Beijing'
+    """
+    parts = filename.split()
+    if len(parts) < 2:
+        parts = filename.split('_')
+    host = parts[0]
+
+    return host[:1].upper() + host[1:]
+
+
+def get_seasons(years):
+    """
+    Determine the season of the Games held in each of the given years.
+    :param years: Array-like of Games years.
+    :return: NumPy array of 'summer' / 'winter' labels.
+    """
+    years = np.asarray(years)
+    shared = years < FIRST_ALTERNATING_YEAR
+    if shared.any():
+        raise ValueError(
+            f"Season cannot be inferred for {', '.join(map(str, np.unique(years[shared])))}; "
+            f"summer and winter Games shared years until {FIRST_ALTERNATING_YEAR}"
+        )
+
+    return np.where(years % 4 == 0, 'summer', 'winter')
+
+
+def get_season(year):
+    """
+    Determine the season of the Games held in a given year.
+    :param year:
+    :return: 'summer' or 'winter'
+    """
+    return str(get_seasons([year])[0])
+
+
+def get_games_from_filename(filename):
+    """
+    Build the Games dimension entry (host city, year, season) for a medals file.
+    :param filename:
+    :return: dict with host_city, year and season keys
+    """
+    year = get_year_from_filename(filename)
+    return {
+        'host_city': get_host_from_filename(filename),
+        'year': year,
+        'season': get_season(year),
+    }
+
+
+def load_games(datasets_path):
+    """
+    Collect one Games entry per CSV file in the datasets directory.
+    """
+    return [
+        get_games_from_filename(filename)
+        for filename in sorted(os.listdir(datasets_path))
+        if filename.endswith(".csv")
+    ]
+
+
+def upsert_games(session, games_entries):
+    """
+    Insert or update Games rows and return their ids.
+    :param session: SQLAlchemy session.
+    :param games_entries: dicts as returned by get_games_from_filename.
+    :return: dict mapping (year, season) to the games id
+    """
+    games_ids = {}
+    for entry in games_entries:
+        games = session.query(Games).filter_by(year=entry['year'], season=entry['season']).one_or_none()
+        if games is None:
+            games = Games(**entry)
+            session.add(games)
+        else:
+            games.host_city = entry['host_city']
+        session.flush()
+        games_ids[(games.year, games.season)] = games.id
+
+    return games_ids
+
+
+def read_medals_batch(file_path, games):
+    """
+    Parse a medal table CSV into a columnar batch. Parsing and type conversion run in
+    pyarrow's C++ CSV reader; missing medal columns or empty cells count as 0.
+    :param file_path: Path to the CSV file.
+    :param games: Games entry for the file, as returned by get_games_from_filename.
+    :return: MedalsBatch of column arrays.
+    """
+    table = pa_csv.read_csv(
+        file_path,
+        convert_options=pa_csv.ConvertOptions(
+            column_types={'NOC': pa.string(), **{column: pa.int64() for column in MEDAL_COLUMNS}},
+            include_columns=['NOC', *MEDAL_COLUMNS],
+            include_missing_columns=True,
+        ),
+    )
+    counts = {
+        name: table.column(column).fill_null(0).to_numpy() for column, name in MEDAL_COLUMNS.items()
+    }
+
+    return MedalsBatch(
+        games=games,
+        nation=table.column('NOC').combine_chunks(),
+        year=np.full(table.num_rows, games['year'], dtype=np.int64),
+        **counts,
+    )
+
+
+def load_dataset_batches(datasets_path):
+    """
+    Yield one columnar MedalsBatch per CSV file in the datasets directory.
+    """
     for filename in os.listdir(datasets_path):
         if filename.endswith(".csv"):
             file_path = os.path.join(datasets_path, filename)
-            year = get_year_from_filename(filename)
-            with open(file_path, mode='r', encoding='utf-8') as csvfile:
-                reader = csv.DictReader(csvfile)
-                for row in reader:
-                    yield row, year
+            yield read_medals_batch(file_path, get_games_from_filename(filename))
+
+
+def load_datasets(datasets_path):
+    """
+    Row-at-a-time view over load_dataset_batches, kept for compatibility.
+    Yields (row, year) tuples where row is keyed by the CSV column names and, as with
+    csv.DictReader, every value is a string.
+    """
+    for batch in load_dataset_batches(datasets_path):
+        year = batch.games['year']
+        counts = (getattr(batch, name).astype(str).tolist() for name in MEDAL_COLUMNS.values())
+        for nation, *values in zip(batch.nation.tolist(), *counts):
+            yield {'NOC': nation, **dict(zip(MEDAL_COLUMNS, values))}, year
 
 
-def create_olympics_medals_entry(row, year):
+def validate_medals_batch(batch):
+    """
+    Check a whole batch at once: every row needs a nation, non-negative counts and a total
+    equal to the sum of its medals.
+    :raises ValueError: naming the offending nations.
+    """
+    problems = []
+    missing_nation = pc.fill_null(pc.equal(pc.utf8_trim_whitespace(batch.nation), ''), True)
+    if pc.any(missing_nation).as_py():
+        problems.append(f"{pc.sum(missing_nation).as_py()} rows without a nation")
+    negative = (np.stack([batch.gold, batch.silver, batch.bronze, batch.total]) < 0).any(axis=0)
+    if negative.any():
+        problems.append(f"negative medal counts for {', '.join(map(str, batch.nation.filter(negative).tolist()))}")
+    mismatched = batch.gold + batch.silver + batch.bronze != batch.total
+    if mismatched.any():
+        problems.append(f"totals do not add up for {', '.join(map(str, batch.nation.filter(mismatched).tolist()))}")
+
+    if problems:
+        raise ValueError(f"Invalid medals for {batch.games['host_city']} {batch.games['year']}: {'; '.join(problems)}")
+
+
+def create_olympics_medals_records(batch, games_id=None):
+    """
+    Turn a batch into column-name keyed records ready for a bulk insert into olympics_medals.
+    """
+    columns = {
+        'nation': batch.nation.tolist(),
+        'year': batch.year.tolist(),
+        **{name: getattr(batch, name).tolist() for name in MEDAL_COLUMNS.values()},
+    }
+    return [
+        {**dict(zip(columns, values)), 'games_id': games_id, 'season': batch.games['season']}
+        for values in zip(*columns.values())
+    ]
+
+
+def upsert_medals_statement(engine):
+    """
+    Bulk insert statement that updates the existing (games_id, nation) row on PostgreSQL and SQLite.
+    """
+    table = OlympicsMedals.__table__
+    if engine.dialect.name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif engine.dialect.name == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        return insert(table)
+
+    statement = dialect_insert(table)
+    return statement.on_conflict_do_update(
+        index_elements=[table.c.games_id, table.c.nation],
+        set_={name: statement.excluded[name] for name in ('year', 'season', *MEDAL_COLUMNS.values())},
+    )
+
+
+def create_olympics_medals_entry(row, year, games_id=None):
     return OlympicsMedals(
         nation=row['NOC'],
         year=year,
@@ -39,6 +236,8 @@ def create_olympics_medals_entry(row, year):
         silver=int(row.get('Silver', 0)),
         bronze=int(row.get('Bronze', 0)),
         total=int(row.get('Total', 0)),
+        games_id=games_id,
+        season=get_season(year),
     )
 
 
@@ -51,6 +250,7 @@ def main():
     engine = create_engine(db_url, echo=True)  # Enable echo for SQL statement logging
 
     # Ensure that the tables are created in the database
+    GamesBase.metadata.create_all(engine)
     Base.metadata.create_all(engine)
 
     # Set up a session to interact with the database
@@ -59,10 +259,15 @@ def main():
 
     datasets_path = os.getenv("OLYMPICS_DATA_PATH")
 
-    # Load datasets and insert data into the database
-    for row, year in load_datasets(datasets_path):
-        olympics_medals_entry = create_olympics_medals_entry(row, year)
-        session.add(olympics_medals_entry)
+    # Build the Games dimension first so medal rows can be keyed by it
+    games_ids = upsert_games(session, load_games(datasets_path))
+
+    # Load datasets a file at a time and upsert each validated batch, so re-runs update in place
+    statement = upsert_medals_statement(engine)
+    for batch in load_dataset_batches(datasets_path):
+        validate_medals_batch(batch)
+        games_id = games_ids[(batch.games['year'], batch.games['season'])]
+        session.execute(statement, create_olympics_medals_records(batch, games_id))
 
     try:
         session.commit()
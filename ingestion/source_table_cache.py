@@ -0,0 +1,117 @@
+import hashlib
+import os
+
+import pandas as pd
+from sqlalchemy import inspect, text
+
+DEFAULT_CACHE_DIR = os.path.join('.cache', 'source_tables')
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+def fingerprint_table(engine, table_name):
+    """
+    Compute a change fingerprint for a table without transferring its rows.
+    On PostgreSQL it combines the row count, max id, the max and sum of the row versions
+    (xmin, which every committed INSERT or UPDATE replaces) and the table oid in the current
+    schema (which changes when the table is replaced). All are transactional, so a committed
+    write is seen by the next call; the aggregate is one scan on the server and returns a
+    single row. SQLite keeps no such markers, so the local file's rows are hashed.
+    Other dialects have no reliable change signal and are not fingerprinted.
+    :param engine: SQLAlchemy engine connected to the source database.
+    :param table_name: Name of the table to fingerprint.
+    :return: Hex digest that changes whenever the table's contents change, or None when the
+        table cannot be fingerprinted and must not be cached.
+    """
+    with engine.connect() as connection:
+        if connection.dialect.name == 'sqlite':
+            digest = hashlib.sha1()
+            result = connection.execution_options(stream_results=True).execute(text(f"SELECT * FROM {table_name}"))
+            for row in result:
+                digest.update(repr(tuple(row)).encode())
+            return digest.hexdigest()[:16]
+        if connection.dialect.name != 'postgresql':
+            return None
+
+        columns = {column['name'] for column in inspect(connection).get_columns(table_name)}
+        max_id = "MAX(id)" if 'id' in columns else "NULL"
+        parts = connection.execute(
+            text(
+                f"SELECT COUNT(*), {max_id}, MAX(xmin::text::bigint), SUM(xmin::text::bigint), ("
+                "SELECT c.oid FROM pg_class c JOIN pg_namespace n ON n.oid = c.relnamespace "
+                "WHERE c.relname = :name AND n.nspname = current_schema()"
+                f") FROM {table_name}"
+            ),
+            {'name': table_name},
+        ).one()
+
+    return hashlib.sha1(repr(tuple(parts)).encode()).hexdigest()[:16]
+
+
+class SourceTableCache:
+    """
+    Read-through cache of typed, normalized source tables stored as Parquet on local disk.
+    Entries are keyed by table fingerprint, so an unchanged table is never re-read from the
+    database, and the least recently used entries are evicted once the size limit is exceeded.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def entry_path(self, table_name, fingerprint, normalize):
+        # The normalizer is part of the key so a different normalization never reuses a frame
+        key = hashlib.sha1(f"{fingerprint}:{normalize.__module__}.{normalize.__qualname__}".encode()).hexdigest()
+        return os.path.join(self.cache_dir, f"{table_name}-{key[:16]}.parquet")
+
+    def read_table(self, table_name, engine, normalize):
+        """
+        Return the normalized table, from disk when its fingerprint is unchanged.
+        :param table_name: Name of the source table.
+        :param engine: SQLAlchemy engine connected to the source database.
+        :param normalize: Function applied to the raw frame before it is cached.
+        :return: A Pandas DataFrame.
+        """
+        fingerprint = fingerprint_table(engine, table_name)
+        if fingerprint is None:
+            return normalize(pd.read_sql_table(table_name, engine))
+
+        path = self.entry_path(table_name, fingerprint, normalize)
+        if os.path.exists(path):
+            os.utime(path)  # Mark as recently used
+            return pd.read_parquet(path)
+
+        df = normalize(pd.read_sql_table(table_name, engine))
+        temp_path = f"{path}.tmp"
+        df.to_parquet(temp_path, index=False)
+        os.replace(temp_path, path)
+
+        self.remove_stale(table_name, keep=path)
+        self.evict()
+        return df
+
+    def entries(self):
+        return [
+            entry for entry in os.scandir(self.cache_dir)
+            if entry.is_file() and entry.name.endswith('.parquet')
+        ]
+
+    def remove_stale(self, table_name, keep):
+        """
+        Drop older entries for a table once a newer fingerprint has been cached.
+        """
+        for entry in self.entries():
+            if entry.name.startswith(f"{table_name}-") and entry.path != keep:
+                os.remove(entry.path)
+
+    def evict(self):
+        """
+        Remove least recently used entries until the cache fits within max_bytes.
+        """
+        entries = sorted(self.entries(), key=lambda entry: entry.stat().st_mtime_ns)
+        total = sum(entry.stat().st_size for entry in entries)
+        for entry in entries:
+            if total <= self.max_bytes:
+                break
+            total -= entry.stat().st_size
+            os.remove(entry.path)
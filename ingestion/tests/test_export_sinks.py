@@ -0,0 +1,158 @@
+import gzip
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import pandas as pd
+import pyarrow.parquet as pq
+from pandas.testing import assert_frame_equal
+from sqlalchemy import create_engine, inspect
+
+from ingestion.export_sinks import (
+    CsvSink,
+    JsonLinesSink,
+    ParquetSink,
+    PartitionedParquetSink,
+    SqlTableSink,
+    export_batches,
+    iter_batches,
+    sinks_from_env,
+)
+from ingestion.ingest_country_olympics_data import read_merged_data
+
+
+class FailingSink:
+    def write_batch(self, df):
+        raise RuntimeError("disk full")
+
+    def close(self):
+        pass
+
+    def abort(self):
+        pass
+
+
+def failing_batches(df):
+    yield df.iloc[:2]
+    raise RuntimeError("source connection lost")
+
+
+class TestExportSinks(unittest.TestCase):
+    def setUp(self):
+        # Create a temporary directory to hold the exported files
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.df = pd.DataFrame({
+            'nation': ['usa', 'chn', 'nor', 'usa', 'nor'],
+            'year': [2004, 2004, 2006, 2008, 2010],
+            'total': [101, 64, 19, 110, 23],
+            'gdp': [37800.0, 5000.0, None, 37800.0, None],
+            'season': ['summer', 'summer', 'winter', 'summer', 'winter'],
+        })
+
+    def tearDown(self):
+        # Clean up the temporary directory
+        self.temp_dir.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.temp_dir.name, name)
+
+    def test_all_sinks_receive_every_batch(self):
+        # File-backed so the sink thread and the test share one database
+        engine = create_engine(f"sqlite:///{self.path('merged.db')}")
+        sinks = [
+            CsvSink(self.path("merged.csv")),
+            JsonLinesSink(self.path("merged.jsonl.gz"), compression='gzip'),
+            ParquetSink(self.path("merged.parquet"), compression='zstd', row_group_size=2),
+            PartitionedParquetSink(self.path("merged_by_season")),
+            SqlTableSink(engine, 'merged'),
+        ]
+        rows = export_batches(iter_batches(self.df, batch_size=2), sinks, queue_size=1)
+        self.assertEqual(rows, 5)
+
+        assert_frame_equal(pd.read_csv(self.path("merged.csv")), self.df)
+        with gzip.open(self.path("merged.jsonl.gz"), mode='rt') as f:
+            assert_frame_equal(pd.read_json(f, lines=True), self.df)
+        assert_frame_equal(pd.read_parquet(self.path("merged.parquet")), self.df)
+        assert_frame_equal(pd.read_sql_table('merged', engine), self.df)
+        engine.dispose()
+        self.assertEqual(pq.ParquetFile(self.path("merged.parquet")).metadata.num_row_groups, 3)
+
+        winter = read_merged_data(self.path("merged_by_season"), season='winter')
+        self.assertEqual(sorted(winter['year']), [2006, 2010])
+
+    def test_sink_errors_are_raised(self):
+        csv_sink = CsvSink(self.path("merged.csv"))
+        with self.assertRaises(RuntimeError):
+            export_batches(iter_batches(self.df, batch_size=1), [FailingSink(), csv_sink], queue_size=1)
+        # The healthy sink still completes
+        self.assertEqual(len(pd.read_csv(self.path("merged.csv"))), 5)
+
+    def test_producer_failure_keeps_previous_outputs(self):
+        engine = create_engine(f"sqlite:///{self.path('merged.db')}")
+
+        def make_sinks():
+            return [
+                CsvSink(self.path("merged.csv")),
+                JsonLinesSink(self.path("merged.jsonl")),
+                ParquetSink(self.path("merged.parquet")),
+                PartitionedParquetSink(self.path("merged_by_season")),
+                SqlTableSink(engine, 'merged'),
+            ]
+
+        export_batches(iter_batches(self.df, batch_size=2), make_sinks())
+        with mock.patch('builtins.print') as print_mock:
+            with self.assertRaises(RuntimeError):
+                export_batches(failing_batches(self.df), make_sinks())
+        print_mock.assert_not_called()
+
+        # Every output still holds the complete previous export and no temporary files remain
+        assert_frame_equal(pd.read_csv(self.path("merged.csv")), self.df)
+        assert_frame_equal(pd.read_json(self.path("merged.jsonl"), lines=True), self.df)
+        assert_frame_equal(pd.read_parquet(self.path("merged.parquet")), self.df)
+        self.assertEqual(len(read_merged_data(self.path("merged_by_season"))), 5)
+        assert_frame_equal(pd.read_sql_table('merged', engine), self.df)
+        self.assertEqual(
+            sorted(os.listdir(self.temp_dir.name)),
+            ['merged.csv', 'merged.db', 'merged.jsonl', 'merged.parquet', 'merged_by_season'],
+        )
+        self.assertEqual(inspect(engine).get_table_names(), ['merged'])
+        engine.dispose()
+
+    def test_leading_all_null_batch(self):
+        df = pd.DataFrame({
+            'nation': ['usa', 'nor', 'fra'],
+            'region': pd.Series([None, 'EUROPE', 'EUROPE'], dtype=object),
+            'season': ['summer', 'winter', 'summer'],
+        })
+        sinks = [ParquetSink(self.path("merged.parquet")), PartitionedParquetSink(self.path("merged_by_season"))]
+        export_batches([df.iloc[:1], df.iloc[1:]], sinks)
+
+        region = pd.read_parquet(self.path("merged.parquet"))['region']
+        self.assertEqual(region.isna().tolist(), [True, False, False])
+        self.assertEqual(region.dropna().tolist(), ['EUROPE', 'EUROPE'])
+        # Every partition file shares one schema
+        dataset = read_merged_data(self.path("merged_by_season")).set_index('nation')
+        self.assertTrue(pd.isna(dataset.loc['usa', 'region']))
+        self.assertEqual(dataset.loc['nor', 'region'], 'EUROPE')
+
+    def test_sinks_from_env(self):
+        environment = {
+            "EXPORT_DIR": self.path("out"),
+            "EXPORT_FORMATS": "csv,jsonl,parquet",
+            "EXPORT_TEXT_COMPRESSION": "gzip",
+            "PARQUET_ROW_GROUP_SIZE": "1000",
+        }
+        with mock.patch.dict(os.environ, environment):
+            sinks = sinks_from_env()
+        self.assertEqual([type(sink) for sink in sinks], [CsvSink, JsonLinesSink, ParquetSink])
+        self.assertTrue(sinks[0].path.endswith(os.path.join("out", "merged_country_olympics_data.csv.gz")))
+        self.assertEqual(sinks[2].row_group_size, 1000)
+
+        with mock.patch.dict(os.environ, {"EXPORT_DIR": self.path("out"), "EXPORT_FORMATS": "xml"}):
+            with self.assertRaises(ValueError):
+                sinks_from_env()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import pandas as pd
+from pandas.testing import assert_frame_equal
+from sqlalchemy import create_engine
+
+from ingestion.export_sinks import iter_batches
+from ingestion import ingest_country_olympics_data
+from ingestion.hash_join import hash_join, partition_ids, partitions_for_budget
+from ingestion.ingest_country_olympics_data import load_and_merge_data, stream_merged_data
+
+
+class TestHashJoin(unittest.TestCase):
+    def setUp(self):
+        # Create a temporary directory for spill files and a file-backed SQLite database
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.spill_dir = os.path.join(self.temp_dir.name, "spill")
+        os.mkdir(self.spill_dir)
+
+        countries = [f"Country {i}" for i in range(40)]
+        self.engine = create_engine(f"sqlite:///{os.path.join(self.temp_dir.name, 'olympics.db')}")
+        pd.DataFrame({
+            'id': range(1, 41),
+            'noc_code': [f"N{i:02d}" for i in range(40)],
+            'country_name': countries,
+        }).to_sql('noc_mapping', self.engine, index=False)
+        pd.DataFrame({
+            'country': [f"{name} " for name in countries[:35]],
+            'population': [1000 * (i + 1) for i in range(35)],
+        }).to_sql('countries', self.engine, index=False)
+        pd.DataFrame({
+            'id': range(1, 201),
+            'nation': [f"N{i % 45:02d}" for i in range(200)],
+            'year': [1994 + 2 * (i % 16) for i in range(200)],
+            'gold': [i % 7 for i in range(200)],
+            'silver': [i % 5 for i in range(200)],
+            'bronze': [i % 3 for i in range(200)],
+            'total': [i % 7 + i % 5 + i % 3 for i in range(200)],
+        }).to_sql('olympics_medals', self.engine, index=False)
+
+    def tearDown(self):
+        self.engine.dispose()
+        self.temp_dir.cleanup()
+
+    def test_partition_ids_are_consistent(self):
+        keys = pd.Series(['norway', 'china', 'norway'])
+        ids = partition_ids(keys, 8)
+        self.assertEqual(ids[0], ids[2])
+        self.assertTrue(((ids >= 0) & (ids < 8)).all())
+
+    def test_partitions_for_budget(self):
+        self.assertEqual(partitions_for_budget(0, 1024, max_workers=2), 1)
+        self.assertEqual(partitions_for_budget(1000, 1000, max_workers=2), 4)
+
+        # 4 workers feeding 3 sinks that each queue 4 batches, plus the batch being handed over
+        buffered = 4 * 3 + 1
+        num_partitions = partitions_for_budget(1000, 1000, max_workers=4, output_bytes=3000, buffered_outputs=buffered)
+        self.assertEqual(num_partitions, 55)
+        # Everything resident at once stays within the budget
+        resident = (4 * (1000 + 3000) + buffered * 3000) / num_partitions
+        self.assertLessEqual(resident, 1000)
+
+    def test_hash_join_matches_merge(self):
+        left = pd.DataFrame({'key': [i % 13 for i in range(100)], 'left_value': range(100)})
+        right = pd.DataFrame({'key': range(10), 'right_value': [f"v{i}" for i in range(10)]})
+
+        batches = list(hash_join(
+            iter_batches(left, 17), iter_batches(right, 3), 'key', 'key', num_partitions=5,
+            spill_dir=self.spill_dir, max_workers=2,
+        ))
+        self.assertGreater(len(batches), 1)
+        joined = pd.concat(batches).sort_values('left_value', ignore_index=True)
+        assert_frame_equal(joined, pd.merge(left, right, on='key'))
+        # Spill files are removed once the join has been consumed
+        self.assertEqual(os.listdir(self.spill_dir), [])
+
+        # An inner join against an empty side yields nothing
+        empty = hash_join(iter_batches(left, 17), iter([]), 'key', 'key', num_partitions=5, spill_dir=self.spill_dir)
+        self.assertEqual(list(empty), [])
+
+    def test_stream_merged_data_matches_in_memory_merge(self):
+        expected = load_and_merge_data(self.engine).sort_values('id_x', ignore_index=True)
+        batches = list(stream_merged_data(
+            self.engine, memory_budget=4096, spill_dir=self.spill_dir, max_workers=2, chunksize=25
+        ))
+        self.assertGreater(len(batches), 1)
+        streamed = pd.concat(batches).sort_values('id_x', ignore_index=True)
+        assert_frame_equal(streamed, expected)
+
+
+    def test_stream_merged_data_budgets_for_output_and_consumers(self):
+        with mock.patch.object(
+            ingest_country_olympics_data, 'partitions_for_budget', wraps=partitions_for_budget
+        ) as budget:
+            list(stream_merged_data(self.engine, memory_budget=4096, spill_dir=self.spill_dir, max_workers=2,
+                                    chunksize=25, buffered_batches=13))
+
+        input_bytes, memory_budget, max_workers, output_bytes, buffered = budget.call_args.args
+        self.assertEqual((memory_budget, max_workers, buffered), (4096, 2, 13))
+        self.assertGreater(output_bytes, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
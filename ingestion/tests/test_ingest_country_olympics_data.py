@@ -0,0 +1,41 @@
+import os
+import tempfile
+import unittest
+
+import pandas as pd
+
+from ingestion.ingest_country_olympics_data import read_merged_data, write_season_partitioned_parquet
+
+
+class TestIngestCountryOlympicsData(unittest.TestCase):
+    def setUp(self):
+        # Create a temporary directory to hold the partitioned dataset
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.dataset_path = os.path.join(self.temp_dir.name, "merged_by_season")
+        self.df = pd.DataFrame({
+            'nation': ['usa', 'nor', 'usa'],
+            'year': [2004, 2006, 2008],
+            'total': [101, 19, 110],
+            'season': ['summer', 'winter', 'summer'],
+        })
+
+    def tearDown(self):
+        # Clean up the temporary directory
+        self.temp_dir.cleanup()
+
+    def test_partitioned_by_season(self):
+        write_season_partitioned_parquet(self.df, self.dataset_path)
+        self.assertEqual(sorted(os.listdir(self.dataset_path)), ['season=summer', 'season=winter'])
+
+        winter = read_merged_data(self.dataset_path, season='winter')
+        self.assertEqual(winter['nation'].tolist(), ['nor'])
+        self.assertEqual(len(read_merged_data(self.dataset_path)), 3)
+
+    def test_rewrite_replaces_partitions(self):
+        write_season_partitioned_parquet(self.df, self.dataset_path)
+        write_season_partitioned_parquet(self.df, self.dataset_path)
+        self.assertEqual(len(read_merged_data(self.dataset_path, season='summer')), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
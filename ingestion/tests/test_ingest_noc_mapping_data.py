@@ -0,0 +1,134 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import pandas as pd
+from sqlalchemy import create_engine
+from sqlalchemy.exc import IntegrityError
+
+from ingestion import ingest_noc_mapping_data
+from ingestion.ingest_noc_mapping_data import (
+    clear_noc_lookups,
+    create_noc_mapping_dataframe,
+    get_noc_lookup,
+    upsert_noc_mapping_data,
+    validate_noc_mapping,
+)
+from schemas.noc_mapping_schema import Base
+
+NOC_MAPPING_DATASET = os.path.join(os.path.dirname(__file__), '..', '..', 'datasets', 'noc', 'noc_mapping.csv')
+
+
+class TestIngestNOCMappingData(unittest.TestCase):
+    def setUp(self):
+        # Create a temporary directory for the reference CSV and a file-backed SQLite database
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.file_path = os.path.join(self.temp_dir.name, "noc_mapping.csv")
+        pd.DataFrame({
+            'id': [1, 2, 3],
+            'noc_code': ['usa', ' NOR', 'LAT'],
+            'country_name': ['United States ', 'Norway', 'Latvia'],
+        }).to_csv(self.file_path, index=False)
+
+        self.engine = create_engine(f"sqlite:///{os.path.join(self.temp_dir.name, 'olympics.db')}")
+        Base.metadata.create_all(self.engine)
+        clear_noc_lookups()
+
+    def tearDown(self):
+        clear_noc_lookups()
+        self.engine.dispose()
+        self.temp_dir.cleanup()
+
+    def test_create_noc_mapping_dataframe(self):
+        df = create_noc_mapping_dataframe(self.file_path)
+        self.assertEqual(df['noc_code'].tolist(), ['USA', 'NOR', 'LAT'])
+        self.assertEqual(df['country_name'].tolist(), ['United States', 'Norway', 'Latvia'])
+        validate_noc_mapping(df)
+
+    def test_validate_noc_mapping(self):
+        df = create_noc_mapping_dataframe(self.file_path)
+        # Alternate codes for the same country are allowed
+        validate_noc_mapping(pd.concat([df, pd.DataFrame({'id': [4], 'noc_code': ['LVA'], 'country_name': ['Latvia']})]))
+
+        invalid = pd.concat([df, pd.DataFrame({'id': [3, 5], 'noc_code': ['USA', 'US'], 'country_name': ['x', 'y']})])
+        with self.assertRaises(ValueError) as context:
+            validate_noc_mapping(invalid)
+        self.assertIn('duplicate NOC codes: USA', str(context.exception))
+        self.assertIn('duplicate ids: 3', str(context.exception))
+        self.assertIn('malformed NOC codes: US', str(context.exception))
+
+    def test_reference_dataset_is_valid(self):
+        validate_noc_mapping(create_noc_mapping_dataframe(NOC_MAPPING_DATASET))
+
+    def test_upsert_is_idempotent(self):
+        df = create_noc_mapping_dataframe(self.file_path)
+        upsert_noc_mapping_data(df, self.engine)
+        df.loc[df['noc_code'] == 'NOR', 'country_name'] = 'Kingdom of Norway'
+        upsert_noc_mapping_data(df, self.engine)
+
+        stored = pd.read_sql_table('noc_mapping', self.engine).set_index('noc_code')
+        self.assertEqual(len(stored), 3)
+        self.assertEqual(stored.loc['NOR', 'country_name'], 'Kingdom of Norway')
+
+    def test_reload_replaces_rekeyed_and_removed_codes(self):
+        df = create_noc_mapping_dataframe(self.file_path)
+        upsert_noc_mapping_data(df, self.engine)
+
+        # USA moves to a new id, NOR and LAT swap ids and LAT is dropped entirely afterwards
+        rekeyed = pd.DataFrame({'id': [7, 3, 2], 'noc_code': ['USA', 'NOR', 'LAT'], 'country_name': ['A', 'B', 'C']})
+        upsert_noc_mapping_data(rekeyed, self.engine)
+        upsert_noc_mapping_data(rekeyed.iloc[:2], self.engine)
+
+        stored = pd.read_sql_table('noc_mapping', self.engine).sort_values('id', ignore_index=True)
+        self.assertEqual(stored.values.tolist(), [[3, 'NOR', 'B'], [7, 'USA', 'A']])
+
+    def test_failed_load_raises_and_changes_nothing(self):
+        df = create_noc_mapping_dataframe(self.file_path)
+        upsert_noc_mapping_data(df, self.engine)
+
+        # Two ids claiming one code cannot be stored; the error is not swallowed
+        invalid = pd.concat([df, pd.DataFrame({'id': [9], 'noc_code': ['USA'], 'country_name': ['x']})])
+        with self.assertRaises(IntegrityError):
+            upsert_noc_mapping_data(invalid, self.engine)
+        self.assertEqual(len(pd.read_sql_table('noc_mapping', self.engine)), 3)
+
+    def test_lookup_is_cached_until_version_changes(self):
+        df = create_noc_mapping_dataframe(self.file_path)
+        upsert_noc_mapping_data(df.iloc[:2], self.engine)
+
+        lookup = get_noc_lookup(self.engine)
+        self.assertEqual(lookup.resolve(' usa'), (1, 'United States'))
+        self.assertEqual(lookup.name_for('NOR'), 'Norway')
+        self.assertIsNone(lookup.id_for('LAT'))
+        with self.assertRaises(TypeError):
+            lookup._by_code['LAT'] = (3, 'Latvia')
+
+        # Within the staleness window the table is not queried at all
+        with mock.patch.object(ingest_noc_mapping_data, 'read_noc_rows') as read_noc_rows:
+            self.assertIs(get_noc_lookup(self.engine), lookup)
+        read_noc_rows.assert_not_called()
+
+        # An unchanged version keeps the same lookup; a changed one reloads it
+        self.assertIs(get_noc_lookup(self.engine, max_staleness=0), lookup)
+        upsert_noc_mapping_data(df, self.engine)
+        refreshed = get_noc_lookup(self.engine, max_staleness=0)
+        self.assertIsNot(refreshed, lookup)
+        self.assertEqual(refreshed.id_for('lat'), 3)
+        self.assertEqual(sorted(refreshed.to_frame()['noc_code']), ['LAT', 'NOR', 'USA'])
+
+    def test_lookup_reloads_on_rename(self):
+        df = create_noc_mapping_dataframe(self.file_path)
+        upsert_noc_mapping_data(df, self.engine)
+        lookup = get_noc_lookup(self.engine)
+
+        # Same row count and max id, different contents
+        df.loc[df['noc_code'] == 'USA', 'country_name'] = 'United States of America'
+        upsert_noc_mapping_data(df, self.engine)
+        refreshed = get_noc_lookup(self.engine, max_staleness=0)
+        self.assertIsNot(refreshed, lookup)
+        self.assertEqual(refreshed.name_for('USA'), 'United States of America')
+
+
+if __name__ == "__main__":
+    unittest.main()
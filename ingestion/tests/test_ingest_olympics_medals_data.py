@@ -4,9 +4,25 @@ import tempfile
 import unittest
 
 from dotenv import load_dotenv
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
 
-from ingestion.ingest_olympics_medals_data import get_year_from_filename, load_datasets, create_olympics_medals_entry
-from schemas.olympics_medals_schema import OlympicsMedals
+from ingestion.ingest_olympics_medals_data import (
+    create_olympics_medals_entry,
+    create_olympics_medals_records,
+    get_games_from_filename,
+    get_season,
+    get_year_from_filename,
+    load_dataset_batches,
+    load_datasets,
+    load_games,
+    read_medals_batch,
+    upsert_games,
+    upsert_medals_statement,
+    validate_medals_batch,
+)
+from schemas.games_schema import Base as GamesBase, Games
+from schemas.olympics_medals_schema import Base, OlympicsMedals
 
 
 class TestIngestOlympicsData(unittest.TestCase):
@@ -32,6 +48,42 @@ class TestIngestOlympicsData(unittest.TestCase):
         self.assertEqual(get_year_from_filename(filename1), 2004)
         self.assertEqual(get_year_from_filename(filename2), 2012)
 
+    def test_get_games_from_filename(self):
+        # Host city and season are kept alongside the year
+        self.assertEqual(
+            get_games_from_filename("Lillehammer 1994 Olympics Nations Medals.csv"),
+            {'host_city': 'Lillehammer', 'year': 1994, 'season': 'winter'},
+        )
+        self.assertEqual(
+            get_games_from_filename("beijing_2022_Olympics_Nations_Medals.csv"),
+            {'host_city': 'Beijing', 'year': 2022, 'season': 'winter'},
+        )
+        self.assertEqual(
+            get_games_from_filename("Paris 2024 Olympics_Nations Medals.csv"),
+            {'host_city': 'Paris', 'year': 2024, 'season': 'summer'},
+        )
+
+    def test_get_season_rejects_shared_years(self):
+        with self.assertRaises(ValueError):
+            get_season(1992)
+
+    def test_upsert_games(self):
+        for filename in ("Athens 2004 Olympics Nations Medals.csv", "Torino 2006 Olympics Nations Medals.csv"):
+            open(os.path.join(self.temp_dir.name, filename), mode='w').close()
+
+        engine = create_engine("sqlite:///:memory:")
+        GamesBase.metadata.create_all(engine)
+        session = sessionmaker(bind=engine)()
+        games_ids = upsert_games(session, load_games(self.temp_dir.name))
+        # Upserting again updates in place rather than duplicating
+        self.assertEqual(upsert_games(session, load_games(self.temp_dir.name)), games_ids)
+        session.commit()
+
+        self.assertEqual(set(games_ids), {(2004, 'summer'), (2006, 'winter')})
+        self.assertEqual(session.query(Games).count(), 2)
+        self.assertEqual(session.get(Games, games_ids[(2006, 'winter')]).host_city, 'Torino')
+        session.close()
+
     def test_load_datasets(self):
         # Create a temporary CSV file for testing
         test_file_path = os.path.join(self.temp_dir.name, "Athens 2004 Olympics Nations Medals.csv")
@@ -48,6 +100,77 @@ class TestIngestOlympicsData(unittest.TestCase):
         self.assertEqual(year, 2004)
         self.assertEqual(row['NOC'], 'USA')
         self.assertEqual(int(row['Gold']), 10)
+        # Values keep the string types csv.DictReader produced
+        self.assertEqual(row, {'NOC': 'USA', 'Gold': '10', 'Silver': '5', 'Bronze': '3', 'Total': '18'})
+
+    def write_medals_file(self, filename, rows, header=('NOC', 'Gold', 'Silver', 'Bronze', 'Total')):
+        file_path = os.path.join(self.temp_dir.name, filename)
+        with open(file_path, mode='w', encoding='utf-8', newline='') as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(header)
+            writer.writerows(rows)
+        return file_path
+
+    def test_read_medals_batch(self):
+        # Missing columns and empty cells are read as zero counts
+        file_path = self.write_medals_file(
+            "Torino 2006 Olympics Nations Medals.csv",
+            [['GER', '11', '12', '6'], ['NOR', '2', '', '6']],
+            header=('NOC', 'Gold', 'Silver', 'Bronze'),
+        )
+        batch = read_medals_batch(file_path, get_games_from_filename(os.path.basename(file_path)))
+        self.assertEqual(batch.nation.tolist(), ['GER', 'NOR'])
+        self.assertEqual(batch.year.tolist(), [2006, 2006])
+        self.assertEqual(batch.silver.tolist(), [12, 0])
+        self.assertEqual(batch.total.tolist(), [0, 0])
+        self.assertEqual(batch.gold.dtype.kind, 'i')
+
+    def test_validate_medals_batch(self):
+        self.write_medals_file("Athens 2004 Olympics Nations Medals.csv", [['USA', '10', '5', '3', '18']])
+        self.write_medals_file(
+            "Torino 2006 Olympics Nations Medals.csv",
+            [['GER', '11', '12', '6', '30'], ['', '1', '0', '0', '1'], [' ', '1', '0', '0', '1']],
+        )
+        batches = {batch.games['year']: batch for batch in load_dataset_batches(self.temp_dir.name)}
+
+        validate_medals_batch(batches[2004])
+        with self.assertRaises(ValueError) as context:
+            validate_medals_batch(batches[2006])
+        self.assertIn('2 rows without a nation', str(context.exception))
+        self.assertIn('totals do not add up for GER', str(context.exception))
+
+    def test_create_olympics_medals_records(self):
+        file_path = self.write_medals_file("Athens 2004 Olympics Nations Medals.csv", [['USA', '10', '5', '3', '18']])
+        batch = read_medals_batch(file_path, get_games_from_filename(os.path.basename(file_path)))
+        records = create_olympics_medals_records(batch, games_id=7)
+        self.assertEqual(records, [{
+            'nation': 'USA', 'year': 2004, 'gold': 10, 'silver': 5, 'bronze': 3, 'total': 18,
+            'games_id': 7, 'season': 'summer',
+        }])
+        # Values are plain Python types so every DB driver accepts them
+        self.assertIs(type(records[0]['gold']), int)
+
+    def test_upsert_medals_is_idempotent(self):
+        file_path = self.write_medals_file("Athens 2004 Olympics Nations Medals.csv", [['USA', '10', '5', '3', '18']])
+        games = get_games_from_filename(os.path.basename(file_path))
+
+        engine = create_engine("sqlite:///:memory:")
+        GamesBase.metadata.create_all(engine)
+        Base.metadata.create_all(engine)
+        session = sessionmaker(bind=engine)()
+        games_id = upsert_games(session, [games])[(2004, 'summer')]
+        records = create_olympics_medals_records(read_medals_batch(file_path, games), games_id)
+        session.execute(upsert_medals_statement(engine), records)
+
+        # A corrected file re-ingested later updates the existing row
+        self.write_medals_file("Athens 2004 Olympics Nations Medals.csv", [['USA', '11', '5', '3', '19']])
+        records = create_olympics_medals_records(read_medals_batch(file_path, games), games_id)
+        session.execute(upsert_medals_statement(engine), records)
+        session.commit()
+
+        rows = session.query(OlympicsMedals).all()
+        self.assertEqual([(row.nation, row.gold, row.total, row.games_id) for row in rows], [('USA', 11, 19, games_id)])
+        session.close()
 
     def test_create_olympics_medals_entry(self):
         # Test creating an OlympicsMedals entry from a row
@@ -59,7 +182,7 @@ class TestIngestOlympicsData(unittest.TestCase):
             'Total': '18'
         }
         year = 2004
-        entry = create_olympics_medals_entry(row, year)
+        entry = create_olympics_medals_entry(row, year, games_id=7)
         self.assertIsInstance(entry, OlympicsMedals)
         self.assertEqual(entry.nation, 'USA')
         self.assertEqual(entry.year, 2004)
@@ -67,6 +190,8 @@ class TestIngestOlympicsData(unittest.TestCase):
         self.assertEqual(entry.silver, 5)
         self.assertEqual(entry.bronze, 3)
         self.assertEqual(entry.total, 18)
+        self.assertEqual(entry.games_id, 7)
+        self.assertEqual(entry.season, 'summer')
 
 
 if __name__ == "__main__":
@@ -0,0 +1,135 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import pandas as pd
+from pandas.testing import assert_frame_equal
+from sqlalchemy import create_engine, text
+
+from ingestion.ingest_country_olympics_data import load_and_merge_data, normalize_olympics_medals
+from ingestion.source_table_cache import SourceTableCache, fingerprint_table
+
+
+class TestSourceTableCache(unittest.TestCase):
+    def setUp(self):
+        # Create a temporary directory for the cache and a file-backed SQLite database
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache_dir = os.path.join(self.temp_dir.name, "cache")
+        self.engine = create_engine(f"sqlite:///{os.path.join(self.temp_dir.name, 'olympics.db')}")
+        pd.DataFrame({
+            'id': [1, 2],
+            'nation': [' USA', 'CHN '],
+            'year': [2004, 2004],
+            'gold': [36, 32],
+            'silver': [39, 17],
+            'bronze': [26, 15],
+            'total': [101, 64],
+        }).to_sql('olympics_medals', self.engine, index=False)
+        pd.DataFrame({'id': [1, 2], 'noc_code': ['USA', 'CHN'], 'country_name': ['United States', 'China']}).to_sql(
+            'noc_mapping', self.engine, index=False
+        )
+        pd.DataFrame({'country': ['United States ', 'China '], 'population': [298444215, 1313973713]}).to_sql(
+            'countries', self.engine, index=False
+        )
+
+    def tearDown(self):
+        self.engine.dispose()
+        self.temp_dir.cleanup()
+
+    def insert_medals(self):
+        with self.engine.begin() as connection:
+            connection.execute(text(
+                "INSERT INTO olympics_medals VALUES (3, 'NOR', 2006, 2, 8, 9, 19)"
+            ))
+
+    def test_fingerprint_changes_with_contents(self):
+        before = fingerprint_table(self.engine, 'olympics_medals')
+        self.assertEqual(fingerprint_table(self.engine, 'olympics_medals'), before)
+        self.insert_medals()
+        self.assertNotEqual(fingerprint_table(self.engine, 'olympics_medals'), before)
+        self.assertTrue(fingerprint_table(self.engine, 'countries'))
+
+    def test_update_without_row_count_change_is_not_served_stale(self):
+        cache = SourceTableCache(self.cache_dir)
+        load_and_merge_data(self.engine, cache)
+        before = fingerprint_table(self.engine, 'olympics_medals')
+        with self.engine.begin() as connection:
+            connection.execute(text("UPDATE olympics_medals SET gold = gold + 100 WHERE id = 1"))
+            connection.execute(text("UPDATE countries SET population = 1 WHERE country = 'China '"))
+
+        self.assertNotEqual(fingerprint_table(self.engine, 'olympics_medals'), before)
+        merged = load_and_merge_data(self.engine, cache).set_index('nation')
+        self.assertEqual(merged.loc['usa', 'gold'], 136)
+        self.assertEqual(merged.loc['chn', 'population'], 1)
+
+    def fake_engine(self, dialect_name, parts=None):
+        connection = mock.MagicMock()
+        connection.dialect.name = dialect_name
+        connection.execute.return_value.one.return_value = parts
+        engine = mock.MagicMock()
+        engine.connect.return_value.__enter__.return_value = connection
+        return engine, connection
+
+    def test_postgresql_fingerprint_uses_row_versions(self):
+        engine, connection = self.fake_engine('postgresql', (2, 2, 7310, 14619, 16384))
+        inspector = mock.Mock(get_columns=mock.Mock(return_value=[{'name': 'id'}, {'name': 'gold'}]))
+        with mock.patch('ingestion.source_table_cache.inspect', return_value=inspector):
+            before = fingerprint_table(engine, 'olympics_medals')
+            statement, params = connection.execute.call_args.args
+            # An UPDATE keeps the count and max id but replaces the row's xmin
+            connection.execute.return_value.one.return_value = (2, 2, 7311, 14620, 16384)
+            after = fingerprint_table(engine, 'olympics_medals')
+
+        self.assertNotEqual(before, after)
+        self.assertIn('MAX(xmin::text::bigint)', str(statement))
+        self.assertIn('n.nspname = current_schema()', str(statement))
+        self.assertNotIn('pg_stat', str(statement))
+        self.assertEqual(params, {'name': 'olympics_medals'})
+
+    def test_unsupported_dialect_is_not_cached(self):
+        engine, connection = self.fake_engine('mysql')
+        self.assertIsNone(fingerprint_table(engine, 'olympics_medals'))
+        connection.execute.assert_not_called()
+
+        cache = SourceTableCache(self.cache_dir)
+        frame = pd.DataFrame({'nation': [' USA'], 'year': [2004]})
+        with mock.patch('ingestion.source_table_cache.pd.read_sql_table', return_value=frame):
+            df = cache.read_table('olympics_medals', engine, normalize_olympics_medals)
+        self.assertEqual(df['nation'].tolist(), ['usa'])
+        self.assertEqual(os.listdir(self.cache_dir), [])
+
+    def test_unchanged_table_is_served_from_disk(self):
+        cache = SourceTableCache(self.cache_dir)
+        first = cache.read_table('olympics_medals', self.engine, normalize_olympics_medals)
+        self.assertEqual(first['nation'].tolist(), ['usa', 'chn'])
+
+        with mock.patch('ingestion.source_table_cache.pd.read_sql_table') as read_sql_table:
+            second = cache.read_table('olympics_medals', self.engine, normalize_olympics_medals)
+        read_sql_table.assert_not_called()
+        assert_frame_equal(first, second)
+
+    def test_changed_table_replaces_stale_entry(self):
+        cache = SourceTableCache(self.cache_dir)
+        cache.read_table('olympics_medals', self.engine, normalize_olympics_medals)
+        self.insert_medals()
+        df = cache.read_table('olympics_medals', self.engine, normalize_olympics_medals)
+
+        self.assertEqual(len(df), 3)
+        self.assertEqual(len(os.listdir(self.cache_dir)), 1)
+
+    def test_evicts_least_recently_used(self):
+        cache = SourceTableCache(self.cache_dir, max_bytes=0)
+        cache.read_table('olympics_medals', self.engine, normalize_olympics_medals)
+        self.assertEqual(os.listdir(self.cache_dir), [])
+
+    def test_load_and_merge_data_with_cache(self):
+        cache = SourceTableCache(self.cache_dir)
+        expected = load_and_merge_data(self.engine)
+        load_and_merge_data(self.engine, cache)
+        assert_frame_equal(load_and_merge_data(self.engine, cache), expected)
+        self.assertEqual(len(os.listdir(self.cache_dir)), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
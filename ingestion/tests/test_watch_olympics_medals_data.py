@@ -0,0 +1,138 @@
+import csv
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import pandas as pd
+from pandas.testing import assert_frame_equal
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
+
+from ingestion.ingest_country_olympics_data import load_and_merge_data, read_merged_data
+from ingestion.watch_olympics_medals_data import MedalsWatcher, snapshot_directory
+from schemas.games_schema import Base as GamesBase
+from schemas.olympics_medals_schema import Base
+
+
+class TestWatchOlympicsMedalsData(unittest.TestCase):
+    def setUp(self):
+        # Create a temporary directory for the CSV drops and the merged artifact
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.datasets_path = os.path.join(self.temp_dir.name, "olympics")
+        os.mkdir(self.datasets_path)
+        self.artifact_path = os.path.join(self.temp_dir.name, "merged.parquet")
+        self.dataset_path = os.path.join(self.temp_dir.name, "merged_by_season")
+
+        self.engine = create_engine(f"sqlite:///{os.path.join(self.temp_dir.name, 'olympics.db')}")
+        GamesBase.metadata.create_all(self.engine)
+        Base.metadata.create_all(self.engine)
+        pd.DataFrame({
+            'id': [1, 2, 3],
+            'noc_code': ['USA', 'CHN', 'NOR'],
+            'country_name': ['United States', 'China', 'Norway'],
+        }).to_sql('noc_mapping', self.engine, index=False)
+        pd.DataFrame({
+            'country': ['United States ', 'China ', 'Norway '],
+            'population': [298444215, 1313973713, 4610820],
+        }).to_sql('countries', self.engine, index=False)
+
+        self.watcher = MedalsWatcher(
+            self.engine, self.datasets_path, self.artifact_path, self.dataset_path, debounce_seconds=2.0
+        )
+
+    def tearDown(self):
+        self.engine.dispose()
+        self.temp_dir.cleanup()
+
+    def write_medals(self, filename, rows, mtime):
+        file_path = os.path.join(self.datasets_path, filename)
+        with open(file_path, mode='w', encoding='utf-8') as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(['NOC', 'Gold', 'Silver', 'Bronze', 'Total'])
+            writer.writerows(rows)
+        # Pin the modification time so consecutive writes always change the signature
+        os.utime(file_path, (mtime, mtime))
+
+    def test_snapshot_directory(self):
+        self.write_medals("Athens 2004 Olympics Nations Medals.csv", [['USA', 1, 0, 0, 1]], mtime=100)
+        open(os.path.join(self.datasets_path, "notes.txt"), mode='w').close()
+        self.assertEqual(list(snapshot_directory(self.datasets_path)), ["Athens 2004 Olympics Nations Medals.csv"])
+
+    def test_debounces_bursts(self):
+        filename = "Athens 2004 Olympics Nations Medals.csv"
+        self.write_medals(filename, [['USA', 1, 0, 0, 1]], mtime=100)
+        self.assertEqual(self.watcher.poll(now=0), [])
+        # A second write inside the debounce window restarts it
+        self.write_medals(filename, [['USA', 2, 0, 0, 2]], mtime=101)
+        self.assertEqual(self.watcher.poll(now=1.5), [])
+        self.assertEqual(self.watcher.poll(now=3), [])
+        self.assertEqual(self.watcher.poll(now=3.5), [filename])
+        self.assertEqual(self.watcher.poll(now=10), [])
+
+    def test_ingests_only_changed_rows_and_refreshes_artifact(self):
+        filename = "Athens 2004 Olympics Nations Medals.csv"
+        self.write_medals(filename, [['USA', 36, 39, 26, 101], ['CHN', 32, 17, 15, 64]], mtime=100)
+        self.watcher.poll(now=0)
+        self.assertEqual(self.watcher.poll(now=2), [filename])
+        self.assertEqual(self.watcher.ingest_file(filename), 2)
+
+        load_and_merge_data(self.engine).to_parquet(self.artifact_path, index=False)
+
+        # USA unchanged, CHN updated, NOR added
+        self.write_medals(
+            filename, [['USA', 36, 39, 26, 101], ['CHN', 33, 17, 15, 65], ['NOR', 0, 0, 1, 1]], mtime=200
+        )
+        self.watcher.poll(now=10)
+        self.assertEqual(self.watcher.poll(now=12), [filename])
+        self.assertEqual(self.watcher.ingest_file(filename), 2)
+
+        # A removed nation is deleted
+        self.write_medals(filename, [['USA', 36, 39, 26, 101], ['CHN', 33, 17, 15, 65]], mtime=300)
+        self.assertEqual(self.watcher.ingest_file(filename), 1)
+
+        medals = pd.read_sql_table('olympics_medals', self.engine).set_index('nation')
+        self.assertEqual(sorted(medals.index), ['CHN', 'USA'])
+        self.assertEqual(medals.loc['CHN', 'total'], 65)
+        self.assertEqual(medals.loc['CHN', 'season'], 'summer')
+
+        # The incrementally refreshed artifact matches a full rebuild
+        expected = load_and_merge_data(self.engine).sort_values('id_x', ignore_index=True)
+        assert_frame_equal(pd.read_parquet(self.artifact_path), expected, check_dtype=False)
+        self.assertEqual(sorted(read_merged_data(self.dataset_path, season='summer')['nation']), ['chn', 'usa'])
+
+    def test_failed_refresh_is_retried_on_a_later_poll(self):
+        filename = "Athens 2004 Olympics Nations Medals.csv"
+        self.write_medals(filename, [['USA', 36, 39, 26, 101], ['CHN', 32, 17, 15, 64]], mtime=100)
+        self.watcher.poll(now=0)
+        self.watcher.process(now=2)
+        load_and_merge_data(self.engine).to_parquet(self.artifact_path, index=False)
+
+        self.write_medals(filename, [['USA', 36, 39, 26, 101], ['CHN', 33, 17, 15, 65]], mtime=200)
+        self.watcher.poll(now=10)
+        with mock.patch.object(self.watcher, 'refresh_artifact', side_effect=OSError("disk full")):
+            self.watcher.process(now=12)
+        # The database was updated but the artifact was not
+        self.assertEqual(list(self.watcher.dirty), [1])
+        self.assertEqual(pd.read_parquet(self.artifact_path).set_index('nation').loc['chn', 'total'], 64)
+
+        self.watcher.process(now=13)
+        self.assertEqual(self.watcher.dirty, {})
+        expected = load_and_merge_data(self.engine).sort_values('id_x', ignore_index=True)
+        assert_frame_equal(pd.read_parquet(self.artifact_path), expected, check_dtype=False)
+
+    def test_failed_ingestion_is_retried(self):
+        filename = "Athens 2004 Olympics Nations Medals.csv"
+        self.write_medals(filename, [['USA', 36, 39, 26, 101]], mtime=100)
+        self.watcher.poll(now=0)
+        error = OperationalError("INSERT", {}, Exception("database is locked"))
+        with mock.patch.object(self.watcher, 'ingest_file', side_effect=error):
+            self.watcher.process(now=2)
+
+        # The file is queued again even though it has not changed since
+        self.assertEqual(self.watcher.poll(now=3), [])
+        self.assertEqual(self.watcher.poll(now=4), [filename])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,310 @@
+import os
+import threading
+import time
+
+import pandas as pd
+from dotenv import load_dotenv
+from sqlalchemy import create_engine, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import sessionmaker
+
+from ingestion.ingest_country_olympics_data import (
+    merge_source_frames,
+    normalize_countries,
+    normalize_noc_mapping,
+    normalize_olympics_medals,
+    write_season_partitioned_parquet,
+)
+from ingestion.ingest_noc_mapping_data import get_noc_lookup
+from ingestion.ingest_olympics_medals_data import (
+    get_games_from_filename,
+    read_medals_batch,
+    upsert_games,
+    validate_medals_batch,
+)
+from schemas.games_schema import Base as GamesBase
+from schemas.olympics_medals_schema import OlympicsMedals, Base
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:  # watchdog is optional; polling alone works everywhere
+    FileSystemEventHandler = object
+    Observer = None
+
+DEFAULT_POLL_INTERVAL = 1.0
+DEFAULT_DEBOUNCE_SECONDS = 2.0
+
+# Failures worth retrying on a later poll rather than stopping the watcher
+RETRYABLE_ERRORS = (ValueError, KeyError, OSError, SQLAlchemyError)
+
+
+def snapshot_directory(datasets_path):
+    """
+    Capture a cheap change signature for every CSV file in the directory.
+    :param datasets_path: Directory holding the medal CSV files.
+    :return: dict mapping filename to (mtime_ns, size)
+    """
+    snapshot = {}
+    with os.scandir(datasets_path) as entries:
+        for entry in entries:
+            if entry.name.endswith(".csv") and entry.is_file():
+                stat = entry.stat()
+                snapshot[entry.name] = (stat.st_mtime_ns, stat.st_size)
+    return snapshot
+
+
+def read_medals_file(file_path, games):
+    """
+    Read and validate a medal table CSV into a mapping of nation to medal counts.
+    :param file_path: Path to the CSV file.
+    :param games: Games entry for the file, as returned by get_games_from_filename.
+    :return: dict mapping NOC to a (gold, silver, bronze, total) tuple
+    """
+    batch = read_medals_batch(file_path, games)
+    validate_medals_batch(batch)
+    counts = zip(batch.gold.tolist(), batch.silver.tolist(), batch.bronze.tolist(), batch.total.tolist())
+    return dict(zip(batch.nation.tolist(), counts))
+
+
+class WakeOnChange(FileSystemEventHandler):
+    """
+    Wakes the polling loop as soon as the OS reports a change, when watchdog is installed.
+    """
+
+    def __init__(self, wake):
+        self.wake = wake
+
+    def on_any_event(self, event):
+        self.wake.set()
+
+
+class MedalsWatcher:
+    """
+    Incrementally ingests medal CSV drops: only rows whose counts changed are written to
+    `olympics_medals`, and only those rows are re-joined and replaced in the merged artifact.
+    """
+
+    def __init__(self, engine, datasets_path, artifact_path=None, dataset_path=None,
+                 debounce_seconds=DEFAULT_DEBOUNCE_SECONDS):
+        self.engine = engine
+        self.Session = sessionmaker(bind=engine)
+        self.datasets_path = datasets_path
+        self.artifact_path = artifact_path
+        self.dataset_path = dataset_path
+        self.debounce_seconds = debounce_seconds
+
+        self.snapshot = {}  # Last seen signature per file
+        self.pending = {}  # Files waiting for writes to settle, with the time of their last change
+        self.ingested = {}  # Medal counts currently stored per games_id
+        self.dirty = {}  # (games, nations) per games_id stored in the database but not yet in the artifact
+        self._noc_lookup = None
+        self._noc_mapping_df = None
+        self._countries_df = None
+
+    def poll(self, now=None):
+        """
+        Compare the directory against the last snapshot and return files whose changes
+        have settled for at least the debounce period.
+        """
+        now = time.monotonic() if now is None else now
+        current = snapshot_directory(self.datasets_path)
+        for filename, signature in current.items():
+            if self.snapshot.get(filename) != signature:
+                self.pending[filename] = now
+        self.snapshot = current
+
+        ready = sorted(
+            filename for filename, changed_at in self.pending.items()
+            if filename in current and now - changed_at >= self.debounce_seconds
+        )
+        for filename in ready:
+            del self.pending[filename]
+        # Files deleted while pending are dropped rather than ingested
+        for filename in set(self.pending) - set(current):
+            del self.pending[filename]
+
+        return ready
+
+    def load_ingested(self, session, games_id):
+        rows = session.query(OlympicsMedals).filter_by(games_id=games_id).all()
+        return {row.nation: (row.gold, row.silver, row.bronze, row.total) for row in rows}
+
+    def ingest_file(self, filename):
+        """
+        Apply the difference between a medal file and what is already stored for its Games.
+        :param filename: Name of the CSV file inside the datasets directory.
+        :return: Number of nations whose rows were inserted, updated or deleted.
+        """
+        games = get_games_from_filename(filename)
+        medals = read_medals_file(os.path.join(self.datasets_path, filename), games)
+
+        session = self.Session()
+        try:
+            games_id = upsert_games(session, [games])[(games['year'], games['season'])]
+            if games_id not in self.ingested:
+                self.ingested[games_id] = self.load_ingested(session, games_id)
+            previous = self.ingested[games_id]
+
+            changed = {nation: counts for nation, counts in medals.items() if previous.get(nation) != counts}
+            removed = set(previous) - set(medals)
+            affected = set(changed) | removed
+
+            existing = {
+                row.nation: row
+                for row in session.query(OlympicsMedals).filter(
+                    OlympicsMedals.games_id == games_id, OlympicsMedals.nation.in_(affected)
+                )
+            }
+            for nation, (gold, silver, bronze, total) in changed.items():
+                row = existing.get(nation)
+                if row is None:
+                    row = OlympicsMedals(nation=nation, year=games['year'], season=games['season'], games_id=games_id)
+                    session.add(row)
+                row.gold, row.silver, row.bronze, row.total = gold, silver, bronze, total
+            for nation in removed:
+                session.delete(existing[nation])
+
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+        self.ingested[games_id] = medals
+        if affected and self.artifact_path and os.path.exists(self.artifact_path):
+            # Recorded before refreshing so a failed refresh is retried even though the
+            # database no longer differs from the file
+            _, nations = self.dirty.setdefault(games_id, (games, set()))
+            nations.update(affected)
+            self.refresh_dirty()
+
+        return len(affected)
+
+    def refresh_dirty(self):
+        """
+        Bring the artifact up to date for every Games whose database rows changed since its
+        last successful refresh.
+        """
+        for games_id in list(self.dirty):
+            games, nations = self.dirty[games_id]
+            self.refresh_artifact(games, games_id, nations)
+            del self.dirty[games_id]
+
+    def reference_frames(self):
+        """
+        Countries change rarely, so they are read once per watcher; the NOC mapping comes from
+        the process-wide lookup and is only rebuilt when that lookup is refreshed.
+        """
+        lookup = get_noc_lookup(self.engine)
+        if lookup is not self._noc_lookup:
+            self._noc_lookup = lookup
+            self._noc_mapping_df = normalize_noc_mapping(lookup.to_frame())
+        if self._countries_df is None:
+            self._countries_df = normalize_countries(pd.read_sql_table('countries', self.engine))
+        return self._noc_mapping_df, self._countries_df
+
+    def refresh_artifact(self, games, games_id, nations):
+        """
+        Replace only the affected nations' rows for one Games in the merged artifact.
+        """
+        medals_table = OlympicsMedals.__table__
+        medals_df = pd.read_sql(
+            select(medals_table).where(medals_table.c.games_id == games_id, medals_table.c.nation.in_(nations)),
+            self.engine,
+        )
+        merged_rows = merge_source_frames(normalize_olympics_medals(medals_df), *self.reference_frames())
+
+        artifact_df = pd.read_parquet(self.artifact_path)
+        lowered = {nation.lower().strip() for nation in nations}
+        stale = (artifact_df['year'] == games['year']) & artifact_df['nation'].isin(lowered)
+        merged_rows = merged_rows.reindex(columns=artifact_df.columns).astype(artifact_df.dtypes.to_dict())
+        artifact_df = pd.concat([artifact_df[~stale], merged_rows], ignore_index=True)
+        artifact_df = artifact_df.sort_values('id_x', ignore_index=True)
+
+        # Write to a temporary file and swap it in so readers never see a partial artifact
+        temp_path = f"{self.artifact_path}.tmp"
+        artifact_df.to_parquet(temp_path, index=False)
+        os.replace(temp_path, self.artifact_path)
+
+        # Only the affected season's partition is rewritten
+        if self.dataset_path and 'season' in artifact_df.columns:
+            write_season_partitioned_parquet(artifact_df[artifact_df['season'] == games['season']], self.dataset_path)
+
+    def process(self, now=None):
+        """
+        Ingest every settled file and retry any artifact refresh that failed earlier. A file
+        that fails is queued again and retried once the debounce period has passed.
+        """
+        now = time.monotonic() if now is None else now
+        for filename in self.poll(now):
+            started = time.monotonic()
+            try:
+                count = self.ingest_file(filename)
+            except RETRYABLE_ERRORS as e:
+                print(f"Failed to ingest '{filename}', will retry: {e}")
+                self.pending[filename] = now
+                continue
+            print(f"Ingested '{filename}': {count} rows changed in {time.monotonic() - started:.2f}s")
+
+        if self.dirty:
+            try:
+                self.refresh_dirty()
+            except RETRYABLE_ERRORS as e:
+                print(f"Failed to refresh '{self.artifact_path}', will retry: {e}")
+
+    def run(self, poll_interval=DEFAULT_POLL_INTERVAL, stop_event=None):
+        """
+        Watch the datasets directory until stop_event is set. Files already present at
+        startup are reconciled against the database on the first pass.
+        """
+        stop_event = stop_event or threading.Event()
+        wake = threading.Event()
+
+        observer = None
+        if Observer is not None:
+            observer = Observer()
+            observer.schedule(WakeOnChange(wake), self.datasets_path, recursive=False)
+            observer.start()
+        print(f"Watching '{self.datasets_path}' ({'events + polling' if observer else 'polling'})...")
+
+        try:
+            while not stop_event.is_set():
+                self.process()
+                timeout = min(poll_interval, self.debounce_seconds) if self.pending or self.dirty else poll_interval
+                wake.wait(timeout)
+                wake.clear()
+        finally:
+            if observer is not None:
+                observer.stop()
+                observer.join()
+
+
+def main():
+    # Load environment variables from a .env file to get DB credentials and other settings
+    load_dotenv()
+
+    # Connect to the database using credentials from the environment variables
+    db_url = os.getenv("DATABASE_URL")
+    engine = create_engine(db_url, echo=False)  # Disable SQL logging for cleaner output
+
+    # Ensure that the tables are created in the database
+    GamesBase.metadata.create_all(engine)
+    Base.metadata.create_all(engine)
+
+    watcher = MedalsWatcher(
+        engine,
+        os.getenv("OLYMPICS_DATA_PATH"),
+        artifact_path=os.getenv("MERGED_ARTIFACT_PATH", "merged_country_olympics_data.parquet"),
+        dataset_path=os.getenv("MERGED_DATASET_PATH", "merged_country_olympics_data_by_season"),
+        debounce_seconds=float(os.getenv("WATCH_DEBOUNCE_SECONDS", DEFAULT_DEBOUNCE_SECONDS)),
+    )
+    try:
+        watcher.run(poll_interval=float(os.getenv("WATCH_POLL_INTERVAL", DEFAULT_POLL_INTERVAL)))
+    except KeyboardInterrupt:
+        print("Stopped watching.")
+
+
+if __name__ == "__main__":
+    main()
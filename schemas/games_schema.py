@@ -0,0 +1,51 @@
+import os
+
+from dotenv import load_dotenv
+from sqlalchemy import create_engine, Column, Integer, String, UniqueConstraint, inspect
+from sqlalchemy.orm import declarative_base, sessionmaker
+
+# Set up the base class for our ORM models
+Base = declarative_base()
+
+
+# Define the Games dimension: one row per edition of the Olympic Games
+class Games(Base):
+    __tablename__ = 'games'
+    # Summer and winter Games have not shared a year since 1994, so (year, season) is unique
+    __table_args__ = (UniqueConstraint('year', 'season', name='uq_games_year_season'),)
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    host_city = Column(String(100))  # Host city as named in the source file (e.g., 'Lillehammer')
+    year = Column(Integer, nullable=False)  # Year of the Games
+    season = Column(String(6), nullable=False)  # 'summer' or 'winter'
+
+
+def main():
+    # Load environment variables from a .env file to get DB credentials and other settings
+    load_dotenv()
+
+    # Connect to the database using credentials from the environment variables
+    db_url = os.getenv("DATABASE_URL")
+    engine = create_engine(db_url, echo=True)  # Enable echo for SQL statement logging
+
+    # Create the table in the database if it doesn't already exist
+    Base.metadata.create_all(engine)
+
+    # Use the inspector to verify that the table was actually created
+    inspector = inspect(engine)
+    tables = inspector.get_table_names(schema='public')
+    if 'games' in tables:
+        print("Table 'games' created successfully in olympics_data.")
+    else:
+        print("Table 'games' was not created in olympics_data.")
+
+    # Set up a session to interact with the database
+    Session = sessionmaker(bind=engine)
+    session = Session()
+
+    # Always close the session when done to free up resources
+    session.close()
+
+
+if __name__ == "__main__":
+    main()
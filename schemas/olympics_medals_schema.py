@@ -1,9 +1,11 @@
 import os
 
 from dotenv import load_dotenv
-from sqlalchemy import create_engine, Column, Integer, String, inspect
+from sqlalchemy import create_engine, Column, ForeignKey, Index, Integer, String, UniqueConstraint, inspect
 from sqlalchemy.orm import declarative_base, sessionmaker
 
+from schemas.games_schema import Games
+
 # Set up the base class for our ORM models
 Base = declarative_base()
 
@@ -11,6 +13,12 @@ Base = declarative_base()
 # Define the OlympicsMedals table structure
 class OlympicsMedals(Base):
     __tablename__ = 'olympics_medals'
+    __table_args__ = (
+        # Season-leading index lets winter-only or summer-only queries skip the other season's rows
+        Index('ix_olympics_medals_season_year', 'season', 'year'),
+        # Each nation has one medal row per Games, so re-ingesting a file updates rather than duplicates
+        UniqueConstraint('games_id', 'nation', name='uq_olympics_medals_games_id_nation'),
+    )
 
     # Define columns for the table
     id = Column(Integer, primary_key=True, autoincrement=True)
@@ -20,6 +28,8 @@ class OlympicsMedals(Base):
     silver = Column(Integer, default=0)  # Number of silver medals, default to 0
     bronze = Column(Integer, default=0)  # Number of bronze medals, default to 0
     total = Column(Integer, default=0)  # Total medals, default to 0
+    games_id = Column(Integer, ForeignKey(Games.id))  # Games these medals were won at
+    season = Column(String(6))  # 'summer' or 'winter', denormalized from the Games for pruning
 
 
 def main():
@@ -30,7 +40,8 @@ def main():
     db_url = os.getenv("DATABASE_URL")
     engine = create_engine(db_url, echo=True)  # Enable echo for SQL statement logging
 
-    # Create the table in the database if it doesn't already exist
+    # Create the table (and the games table it references) if it doesn't already exist
+    Games.metadata.create_all(engine)
     Base.metadata.create_all(engine)
 
     # Use the inspector to verify that the table was actually created
@@ -0,0 +1,320 @@
+"""
+Helpers for writing Alembic revisions that do not block ingestion or readers.
+
+Plain `op.add_column` / `op.alter_column` / `op.drop_column` calls take ACCESS EXCLUSIVE
+locks on PostgreSQL and, for type changes, rewrite the whole table. Revisions that touch
+`countries` or `olympics_medals` should instead:
+
+- build indexes with `create_index_concurrently`,
+- change column types with `change_column_type_online` (add, backfill in batches, swap),
+- add NOT NULL, foreign key and unique constraints with `set_not_null_online`,
+  `add_foreign_key_online` and `add_unique_constraint_online`,
+- wrap any remaining DDL in `run_with_lock_timeout` so it gives up quickly and retries
+  instead of queueing behind long-running readers.
+
+On other dialects (e.g. SQLite in tests) every helper falls back to the plain operation.
+"""
+import time
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.exc import OperationalError
+
+LOCK_NOT_AVAILABLE = '55P03'  # PostgreSQL SQLSTATE raised when lock_timeout expires
+DEFAULT_LOCK_TIMEOUT = '2s'
+DEFAULT_ATTEMPTS = 5
+DEFAULT_BACKOFF = 0.5
+DEFAULT_BATCH_SIZE = 10000
+
+
+def is_postgresql():
+    return op.get_context().dialect.name == 'postgresql'
+
+
+def is_offline():
+    return op.get_context().as_sql
+
+
+def is_lock_timeout(error):
+    return getattr(getattr(error, 'orig', None), 'pgcode', None) == LOCK_NOT_AVAILABLE
+
+
+def run_with_lock_timeout(operation, lock_timeout=DEFAULT_LOCK_TIMEOUT, attempts=DEFAULT_ATTEMPTS,
+                          backoff=DEFAULT_BACKOFF):
+    """
+    Run a DDL callable under a short lock_timeout, retrying with exponential backoff when
+    the lock cannot be acquired. Each attempt runs in a savepoint so a timed-out attempt
+    releases whatever it had locked before waiting again. The previous lock_timeout is
+    restored afterwards so later statements are unaffected.
+    :param operation: Callable issuing the DDL, e.g. `lambda: op.drop_column(...)`.
+    :param lock_timeout: PostgreSQL interval string applied to each attempt.
+    :param attempts: Maximum number of attempts before the error is raised.
+    :param backoff: Seconds to wait after the first failed attempt; doubled on each retry.
+    :return: Whatever `operation` returns.
+    """
+    if not is_postgresql():
+        return operation()
+    if is_offline():
+        # A rendered script cannot retry; the timeout is still scoped to this operation only
+        op.execute(f"SET lock_timeout = '{lock_timeout}'")
+        result = operation()
+        op.execute("RESET lock_timeout")
+        return result
+
+    bind = op.get_bind()
+    previous_timeout = bind.exec_driver_sql("SHOW lock_timeout").scalar()
+    for attempt in range(1, attempts + 1):
+        savepoint = bind.begin_nested()
+        try:
+            bind.exec_driver_sql(f"SET LOCAL lock_timeout = '{lock_timeout}'")
+            result = operation()
+            bind.exec_driver_sql(f"SET LOCAL lock_timeout = '{previous_timeout}'")
+            savepoint.commit()
+            return result
+        except OperationalError as e:
+            savepoint.rollback()
+            if not is_lock_timeout(e) or attempt == attempts:
+                raise
+            print(f"Lock not acquired (attempt {attempt}/{attempts}), retrying...")
+            time.sleep(backoff * 2 ** (attempt - 1))
+
+
+def create_index_concurrently(index_name, table_name, columns, **kw):
+    """
+    Build an index without blocking writes. On PostgreSQL this runs CREATE INDEX
+    CONCURRENTLY outside the migration transaction, first dropping any INVALID index
+    left behind by a previously interrupted build.
+    """
+    if not is_postgresql():
+        op.create_index(index_name, table_name, columns, **kw)
+        return
+
+    with op.get_context().autocommit_block():
+        if not is_offline():
+            invalid = op.get_bind().execute(
+                sa.text(
+                    "SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+                    "WHERE c.relname = :name AND NOT i.indisvalid"
+                ),
+                {'name': index_name},
+            ).scalar()
+            if invalid:
+                op.drop_index(index_name, table_name=table_name, postgresql_concurrently=True)
+        op.create_index(index_name, table_name, columns, postgresql_concurrently=True, if_not_exists=True, **kw)
+
+
+def drop_index_concurrently(index_name, table_name):
+    if not is_postgresql():
+        op.drop_index(index_name, table_name=table_name)
+        return
+
+    with op.get_context().autocommit_block():
+        op.drop_index(index_name, table_name=table_name, postgresql_concurrently=True, if_exists=True)
+
+
+def add_column_online(table_name, column, **kw):
+    """
+    Add a column as a metadata-only change. The column is always added as nullable; use
+    `backfill_in_batches` and `set_not_null_online` to tighten it afterwards.
+    """
+    column.nullable = True
+    run_with_lock_timeout(lambda: op.add_column(table_name, column), **kw)
+
+
+def drop_column_online(table_name, column_name, **kw):
+    run_with_lock_timeout(lambda: op.drop_column(table_name, column_name), **kw)
+
+
+def run_in_batches(table_name, sql, batch_size=DEFAULT_BATCH_SIZE, key='id'):
+    """
+    Run an UPDATE or DELETE in bounded primary-key ranges. On PostgreSQL each batch commits
+    on its own, so row locks are held for one batch at a time and ingestion can interleave.
+    :param table_name: Table the statement touches.
+    :param sql: Statement with a WHERE clause; the key range is ANDed onto it.
+    :param batch_size: Number of key values covered by each batch.
+    :param key: Integer primary key column used to slice the table.
+    :return: None
+    """
+    if is_offline():
+        op.execute(sql)
+        return
+
+    bind = op.get_bind()
+    low, high = bind.execute(sa.text(f"SELECT MIN({key}), MAX({key}) FROM {table_name}")).one()
+    if low is None:
+        return
+
+    for start in range(low, high + 1, batch_size):
+        statement = sa.text(f"{sql} AND {table_name}.{key} >= :start AND {table_name}.{key} < :stop")
+        params = {'start': start, 'stop': start + batch_size}
+        if is_postgresql():
+            with op.get_context().autocommit_block():
+                op.get_bind().execute(statement, params)
+        else:
+            bind.execute(statement, params)
+
+
+def backfill_in_batches(table_name, column_name, value_sql, batch_size=DEFAULT_BATCH_SIZE, key='id'):
+    """
+    Populate a column in bounded primary-key ranges; see run_in_batches.
+    :param table_name: Table to update.
+    :param column_name: Column to populate; only rows where it is NULL are touched.
+    :param value_sql: SQL expression computing the new value, e.g. "CAST(population AS BIGINT)".
+    :param batch_size: Number of key values covered by each UPDATE.
+    :param key: Integer primary key column used to slice the table.
+    :return: None
+    """
+    run_in_batches(
+        table_name,
+        f"UPDATE {table_name} SET {column_name} = {value_sql} WHERE {column_name} IS NULL",
+        batch_size=batch_size,
+        key=key,
+    )
+
+
+def delete_in_batches(table_name, where_sql, batch_size=DEFAULT_BATCH_SIZE, key='id'):
+    """
+    Delete the rows matching `where_sql` in bounded primary-key ranges; see run_in_batches.
+    """
+    run_in_batches(table_name, f"DELETE FROM {table_name} WHERE ({where_sql})", batch_size=batch_size, key=key)
+
+
+def validate_constraint(table_name, constraint_name):
+    """
+    Validate a NOT VALID constraint in its own transaction. The ADD CONSTRAINT is committed
+    first so its stronger lock is released; VALIDATE only takes SHARE UPDATE EXCLUSIVE,
+    so reads and writes continue while existing rows are scanned.
+    """
+    with op.get_context().autocommit_block():
+        op.execute(f"ALTER TABLE {table_name} VALIDATE CONSTRAINT {constraint_name}")
+
+
+def set_not_null_online(table_name, column_name, **kw):
+    """
+    Make a column NOT NULL without a long ACCESS EXCLUSIVE scan. PostgreSQL 12+ skips the
+    table scan in SET NOT NULL when a validated CHECK constraint already proves it.
+    """
+    if not is_postgresql():
+        with op.batch_alter_table(table_name) as batch_op:
+            batch_op.alter_column(column_name, nullable=False)
+        return
+
+    constraint_name = f"{table_name}_{column_name}_not_null"
+    run_with_lock_timeout(
+        lambda: op.execute(
+            f"ALTER TABLE {table_name} ADD CONSTRAINT {constraint_name} "
+            f"CHECK ({column_name} IS NOT NULL) NOT VALID"
+        ),
+        **kw,
+    )
+    validate_constraint(table_name, constraint_name)
+    run_with_lock_timeout(lambda: op.alter_column(table_name, column_name, nullable=False), **kw)
+    run_with_lock_timeout(lambda: op.drop_constraint(constraint_name, table_name, type_='check'), **kw)
+
+
+def add_foreign_key_online(constraint_name, source_table, referent_table, local_cols, remote_cols, **kw):
+    """
+    Add a foreign key as NOT VALID, then validate it separately so existing rows are
+    checked without blocking writes to either table.
+    """
+    if not is_postgresql():
+        with op.batch_alter_table(source_table) as batch_op:
+            batch_op.create_foreign_key(constraint_name, referent_table, local_cols, remote_cols)
+        return
+
+    run_with_lock_timeout(
+        lambda: op.execute(
+            f"ALTER TABLE {source_table} ADD CONSTRAINT {constraint_name} "
+            f"FOREIGN KEY ({', '.join(local_cols)}) REFERENCES {referent_table} ({', '.join(remote_cols)}) NOT VALID"
+        ),
+        **kw,
+    )
+    validate_constraint(source_table, constraint_name)
+
+
+def drop_foreign_key_online(constraint_name, table_name, **kw):
+    if not is_postgresql():
+        with op.batch_alter_table(table_name) as batch_op:
+            batch_op.drop_constraint(constraint_name, type_='foreignkey')
+        return
+
+    run_with_lock_timeout(lambda: op.drop_constraint(constraint_name, table_name, type_='foreignkey'), **kw)
+
+
+def add_unique_constraint_online(constraint_name, table_name, columns, **kw):
+    """
+    Add a unique constraint without holding a lock while its index is built. On PostgreSQL
+    the unique index is built concurrently and then attached with ADD CONSTRAINT ... USING
+    INDEX, which only needs a brief lock.
+    """
+    if not is_postgresql():
+        with op.batch_alter_table(table_name) as batch_op:
+            batch_op.create_unique_constraint(constraint_name, columns)
+        return
+
+    create_index_concurrently(constraint_name, table_name, columns, unique=True)
+    run_with_lock_timeout(
+        lambda: op.execute(
+            f"ALTER TABLE {table_name} ADD CONSTRAINT {constraint_name} UNIQUE USING INDEX {constraint_name}"
+        ),
+        **kw,
+    )
+
+
+def drop_unique_constraint_online(constraint_name, table_name, **kw):
+    if not is_postgresql():
+        with op.batch_alter_table(table_name) as batch_op:
+            batch_op.drop_constraint(constraint_name, type_='unique')
+        return
+
+    run_with_lock_timeout(lambda: op.drop_constraint(constraint_name, table_name, type_='unique'), **kw)
+
+
+def change_column_type_online(table_name, column_name, new_type, using=None, batch_size=DEFAULT_BATCH_SIZE,
+                              nullable=True, **kw):
+    """
+    Change a column's type without rewriting the table under an exclusive lock: add a shadow
+    column, keep it in sync with a trigger, backfill in batches, then swap the names.
+    :param table_name: Table holding the column.
+    :param column_name: Column whose type changes.
+    :param new_type: SQLAlchemy type for the new column.
+    :param using: SQL expression converting the old value, with `{column}` standing for the
+        old column; defaults to a plain CAST.
+    :param batch_size: Rows per backfill batch.
+    :param nullable: Whether the final column allows NULLs.
+    :return: None
+    """
+    shadow_name = f"{column_name}_new"
+    type_sql = new_type.compile(dialect=op.get_context().dialect)
+    using = using or f"CAST({{column}} AS {type_sql})"
+    trigger_name = f"{table_name}_{shadow_name}_sync"
+
+    add_column_online(table_name, sa.Column(shadow_name, new_type), **kw)
+
+    # Rows written while the backfill runs are converted by the trigger
+    if is_postgresql():
+        op.execute(
+            f"CREATE OR REPLACE FUNCTION {trigger_name}() RETURNS trigger AS $$ "
+            f"BEGIN NEW.{shadow_name} := {using.format(column=f'NEW.{column_name}')}; RETURN NEW; END "
+            f"$$ LANGUAGE plpgsql"
+        )
+        run_with_lock_timeout(
+            lambda: op.execute(
+                f"CREATE TRIGGER {trigger_name} BEFORE INSERT OR UPDATE ON {table_name} "
+                f"FOR EACH ROW EXECUTE FUNCTION {trigger_name}()"
+            ),
+            **kw,
+        )
+
+    backfill_in_batches(table_name, shadow_name, using.format(column=column_name), batch_size=batch_size)
+    if not nullable:
+        set_not_null_online(table_name, shadow_name, **kw)
+
+    def swap():
+        if is_postgresql():
+            op.execute(f"DROP TRIGGER {trigger_name} ON {table_name}")
+            op.execute(f"DROP FUNCTION {trigger_name}()")
+        op.drop_column(table_name, column_name)
+        op.alter_column(table_name, shadow_name, new_column_name=column_name)
+
+    run_with_lock_timeout(swap, **kw)
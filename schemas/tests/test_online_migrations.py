@@ -0,0 +1,144 @@
+import io
+import unittest
+
+import sqlalchemy as sa
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+from sqlalchemy import create_engine, inspect
+
+from schemas.online_migrations import (
+    add_column_online,
+    add_foreign_key_online,
+    add_unique_constraint_online,
+    backfill_in_batches,
+    change_column_type_online,
+    create_index_concurrently,
+    delete_in_batches,
+    drop_foreign_key_online,
+    drop_unique_constraint_online,
+    set_not_null_online,
+)
+
+
+class TestOnlineMigrations(unittest.TestCase):
+    def setUp(self):
+        # Set up an in-memory SQLite database with a small countries table
+        self.engine = create_engine("sqlite:///:memory:")
+        self.connection = self.engine.connect()
+        self.connection.exec_driver_sql(
+            "CREATE TABLE countries (id INTEGER PRIMARY KEY, country VARCHAR(100), climate TEXT)"
+        )
+        for i, climate in enumerate(['1', '2', '1.5', None, '3'], start=1):
+            self.connection.execute(
+                sa.text("INSERT INTO countries (id, country, climate) VALUES (:id, :country, :climate)"),
+                {'id': i, 'country': f'country {i}', 'climate': climate},
+            )
+        self.context = MigrationContext.configure(self.connection)
+
+    def tearDown(self):
+        self.connection.close()
+
+    def test_add_column_and_backfill_in_batches(self):
+        with Operations.context(self.context):
+            add_column_online('countries', sa.Column('country_upper', sa.String(100), nullable=False))
+            backfill_in_batches('countries', 'country_upper', 'UPPER(country)', batch_size=2)
+            set_not_null_online('countries', 'country_upper')
+
+        rows = self.connection.exec_driver_sql("SELECT country_upper FROM countries ORDER BY id").fetchall()
+        self.assertEqual([row[0] for row in rows], [f'COUNTRY {i}' for i in range(1, 6)])
+        columns = {column['name']: column for column in inspect(self.connection).get_columns('countries')}
+        self.assertFalse(columns['country_upper']['nullable'])
+
+    def test_delete_in_batches(self):
+        with Operations.context(self.context):
+            delete_in_batches('countries', "climate IS NULL OR climate = '1'", batch_size=2)
+
+        rows = self.connection.exec_driver_sql("SELECT id FROM countries ORDER BY id").fetchall()
+        self.assertEqual([row[0] for row in rows], [2, 3, 5])
+
+    def test_change_column_type_online(self):
+        with Operations.context(self.context):
+            change_column_type_online('countries', 'climate', sa.Float(), batch_size=2)
+
+        columns = {column['name']: column['type'] for column in inspect(self.connection).get_columns('countries')}
+        self.assertNotIn('climate_new', columns)
+        self.assertIsInstance(columns['climate'], sa.Float)
+        rows = self.connection.exec_driver_sql("SELECT climate FROM countries ORDER BY id").fetchall()
+        self.assertEqual([row[0] for row in rows], [1.0, 2.0, 1.5, None, 3.0])
+
+    def test_create_index(self):
+        with Operations.context(self.context):
+            create_index_concurrently('ix_countries_country', 'countries', ['country'])
+
+        indexes = [index['name'] for index in inspect(self.connection).get_indexes('countries')]
+        self.assertIn('ix_countries_country', indexes)
+
+    def test_constraints_fall_back_to_batch_mode(self):
+        self.connection.exec_driver_sql("CREATE TABLE noc_mapping (id INTEGER PRIMARY KEY)")
+        self.connection.exec_driver_sql("ALTER TABLE countries ADD COLUMN noc_mapping_id INTEGER")
+        with Operations.context(self.context):
+            add_foreign_key_online('fk_countries_noc', 'countries', 'noc_mapping', ['noc_mapping_id'], ['id'])
+            add_unique_constraint_online('uq_countries_country', 'countries', ['country'])
+
+        inspector = inspect(self.connection)
+        self.assertEqual([fk['name'] for fk in inspector.get_foreign_keys('countries')], ['fk_countries_noc'])
+        self.assertEqual([uq['name'] for uq in inspector.get_unique_constraints('countries')], ['uq_countries_country'])
+
+        with Operations.context(self.context):
+            drop_unique_constraint_online('uq_countries_country', 'countries')
+            drop_foreign_key_online('fk_countries_noc', 'countries')
+
+        inspector = inspect(self.connection)
+        self.assertEqual(inspector.get_foreign_keys('countries'), [])
+        self.assertEqual(inspector.get_unique_constraints('countries'), [])
+
+    def test_postgresql_statements(self):
+        # Render the PostgreSQL path offline to check the non-blocking statements are emitted
+        buffer = io.StringIO()
+        context = MigrationContext.configure(
+            dialect_name='postgresql', opts={'as_sql': True, 'output_buffer': buffer}
+        )
+        with Operations.context(context):
+            create_index_concurrently('ix_countries_country', 'countries', ['country'])
+            change_column_type_online('countries', 'climate', sa.Float())
+            add_foreign_key_online('fk_countries_noc', 'countries', 'noc_mapping', ['noc_mapping_id'], ['id'])
+            add_unique_constraint_online('uq_countries_country', 'countries', ['country'])
+
+        sql = buffer.getvalue()
+        self.assertIn('CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_countries_country', sql)
+        self.assertIn("SET lock_timeout = '2s'", sql)
+        self.assertIn('ALTER TABLE countries ADD COLUMN climate_new FLOAT', sql)
+        self.assertIn('NEW.climate_new := CAST(NEW.climate AS FLOAT)', sql)
+        self.assertIn('UPDATE countries SET climate_new = CAST(climate AS FLOAT) WHERE climate_new IS NULL', sql)
+        self.assertIn('ALTER TABLE countries RENAME climate_new TO climate', sql)
+        self.assertNotIn('TYPE FLOAT', sql)
+        self.assertIn('REFERENCES noc_mapping (id) NOT VALID', sql)
+        self.assertIn('VALIDATE CONSTRAINT fk_countries_noc', sql)
+        self.assertIn('CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS uq_countries_country', sql)
+        self.assertIn('ADD CONSTRAINT uq_countries_country UNIQUE USING INDEX uq_countries_country', sql)
+        # Every lock_timeout is scoped to the statement it guards
+        self.assertEqual(sql.count("SET lock_timeout ="), sql.count("RESET lock_timeout"))
+
+    def test_postgresql_validate_runs_in_own_transaction(self):
+        buffer = io.StringIO()
+        context = MigrationContext.configure(
+            dialect_name='postgresql',
+            opts={'as_sql': True, 'output_buffer': buffer, 'transaction_per_migration': True},
+        )
+        with Operations.context(context), context.begin_transaction():
+            set_not_null_online('countries', 'country')
+            add_foreign_key_online('fk_countries_noc', 'countries', 'noc_mapping', ['noc_mapping_id'], ['id'])
+
+        statements = [statement.strip() for statement in buffer.getvalue().split(';') if statement.strip()]
+        for constraint_name in ('countries_country_not_null', 'fk_countries_noc'):
+            add = next(i for i, statement in enumerate(statements)
+                       if f'ADD CONSTRAINT {constraint_name}' in statement)
+            validate = statements.index(f'ALTER TABLE countries VALIDATE CONSTRAINT {constraint_name}')
+            # The ADD's lock is released by a COMMIT before the validation scan starts
+            self.assertIn('COMMIT', statements[add:validate])
+            self.assertEqual(statements[validate - 1], 'COMMIT')
+            self.assertEqual(statements[validate + 1], 'BEGIN')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,310 @@
+import asyncio
+import base64
+import binascii
+import hashlib
+import io
+import json
+import os
+from collections import OrderedDict
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import pandas as pd
+from dotenv import load_dotenv
+
+MEDAL_COLUMNS = ['nation', 'year', 'gold', 'silver', 'bronze', 'total']
+GAMES_COLUMNS = ['season', 'games_id']
+ID_COLUMNS = ['id_x', 'id_y', 'noc_mapping_id']
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+DEFAULT_CACHE_SIZE = 1024
+
+REASONS = {
+    200: 'OK',
+    304: 'Not Modified',
+    400: 'Bad Request',
+    404: 'Not Found',
+    405: 'Method Not Allowed',
+}
+
+
+class MedalsArtifact:
+    """
+    Read-only, pre-indexed view of the merged country/olympics artifact.
+    All indexes are built once at load time so requests never touch pandas.
+    """
+
+    def __init__(self, df, version):
+        self.version = version
+        self.etag = f'"{version}"'
+
+        # Replace NaN with None so every record serializes to valid JSON
+        df = df.astype(object).where(df.notna(), None)
+        medal_columns = MEDAL_COLUMNS + [column for column in GAMES_COLUMNS if column in df.columns]
+        country_columns = [column for column in df.columns if column not in medal_columns + ID_COLUMNS]
+
+        medals = df[medal_columns].to_dict('records')
+        medals.sort(key=lambda r: (r['year'], -r['gold'], -r['silver'], -r['bronze'], r['nation']))
+
+        self.medals = medals
+        self.medal_tables = {}
+        self.season_medals = {}
+        self.nation_histories = {}
+        for record in medals:
+            self.medal_tables.setdefault(record['year'], []).append(record)
+            self.nation_histories.setdefault(record['nation'], []).append(record)
+            if 'season' in record:
+                self.season_medals.setdefault(record['season'], []).append(record)
+
+        self.countries = {}
+        for record in df.drop_duplicates('nation')[['nation'] + country_columns].to_dict('records'):
+            self.countries[record['nation']] = record
+        self.nations = sorted(self.countries)
+
+
+def load_artifact(path):
+    """
+    Load the merged Parquet artifact and index it for serving.
+    :param path: Path to the merged Parquet file.
+    :return: A MedalsArtifact whose version is a content hash of the file.
+    """
+    with open(path, mode='rb') as f:
+        data = f.read()
+    version = hashlib.sha256(data).hexdigest()[:16]
+    df = pd.read_parquet(io.BytesIO(data))
+    return MedalsArtifact(df, version)
+
+
+class ResponseCache:
+    """
+    Bounded LRU cache of rendered response bodies, keyed by normalized request target.
+    """
+
+    def __init__(self, max_entries=DEFAULT_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key, entry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class BadRequest(Exception):
+    pass
+
+
+def encode_cursor(version, offset):
+    return base64.urlsafe_b64encode(f'{version}:{offset}'.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, version):
+    """
+    Decode a pagination cursor, rejecting cursors issued for another artifact version.
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        cursor_version, offset = base64.urlsafe_b64decode(padded).decode().split(':')
+        offset = int(offset)
+    except (ValueError, binascii.Error, UnicodeDecodeError):
+        raise BadRequest('invalid cursor')
+    if cursor_version != version:
+        raise BadRequest('cursor was issued for a different artifact version')
+    if offset < 0:
+        raise BadRequest('invalid cursor')
+    return offset
+
+
+def paginate(items, query, version):
+    """
+    Slice a pre-sorted list according to the `limit` and `cursor` query parameters.
+    """
+    try:
+        limit = int(query.get('limit', DEFAULT_PAGE_SIZE))
+    except ValueError:
+        raise BadRequest('limit must be an integer')
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    offset = decode_cursor(query['cursor'], version) if 'cursor' in query else 0
+
+    page = items[offset:offset + limit]
+    next_offset = offset + limit
+    next_cursor = encode_cursor(version, next_offset) if next_offset < len(items) else None
+    return {'items': page, 'next_cursor': next_cursor}
+
+
+def route(artifact, path, query):
+    """
+    Resolve a request path to a JSON-serializable payload.
+    :return: Tuple of (status, payload).
+    """
+    parts = [unquote(part) for part in path.strip('/').split('/') if part]
+
+    if parts == ['medals']:
+        if 'year' in query:
+            try:
+                year = int(query['year'])
+            except ValueError:
+                raise BadRequest('year must be an integer')
+            items = artifact.medal_tables.get(year, [])
+        elif 'season' in query:
+            items = artifact.season_medals.get(query['season'].lower(), [])
+        else:
+            items = artifact.medals
+        return 200, paginate(items, query, artifact.version)
+
+    if parts == ['nations']:
+        return 200, paginate(artifact.nations, query, artifact.version)
+
+    if len(parts) in (2, 3) and parts[0] == 'nations':
+        nation = parts[1].lower().strip()
+        if nation not in artifact.countries:
+            return 404, {'error': f"unknown nation '{parts[1]}'"}
+        if len(parts) == 2:
+            return 200, artifact.countries[nation]
+        if parts[2] == 'medals':
+            return 200, paginate(artifact.nation_histories[nation], query, artifact.version)
+
+    return 404, {'error': 'not found'}
+
+
+def etag_matches(if_none_match, etag):
+    if if_none_match is None:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(',')]
+    return '*' in candidates or any(candidate.removeprefix('W/') == etag for candidate in candidates)
+
+
+def handle_request(artifact, cache, method, target, headers):
+    """
+    Produce a response for a single request without any I/O.
+    :param artifact: The loaded MedalsArtifact.
+    :param cache: ResponseCache holding rendered bodies for this artifact version.
+    :param method: HTTP method.
+    :param target: Request target (path plus optional query string).
+    :param headers: Request headers with lower-cased names.
+    :return: Tuple of (status, response headers, body bytes).
+    """
+    response_headers = {'Content-Type': 'application/json', 'ETag': artifact.etag}
+
+    if method not in ('GET', 'HEAD'):
+        response_headers['Allow'] = 'GET, HEAD'
+        return 405, response_headers, json.dumps({'error': 'method not allowed'}).encode()
+
+    split = urlsplit(target)
+    query = {key: values[-1] for key, values in parse_qs(split.query).items()}
+    cache_key = (split.path.rstrip('/'), tuple(sorted(query.items())))
+
+    entry = cache.get(cache_key)
+    if entry is None:
+        try:
+            status, payload = route(artifact, split.path, query)
+        except BadRequest as e:
+            status, payload = 400, {'error': str(e)}
+        entry = (status, json.dumps(payload).encode())
+        if status == 200:
+            cache.put(cache_key, entry)
+
+    status, body = entry
+    # The artifact is immutable once loaded, so its version validates every successful resource
+    if status == 200 and etag_matches(headers.get('if-none-match'), artifact.etag):
+        return 304, response_headers, b''
+    return status, response_headers, body
+
+
+async def read_request(reader):
+    """
+    Read a request line and headers; returns None once the client closes the connection.
+    """
+    request_line = await reader.readline()
+    if not request_line:
+        return None
+    method, target, version = request_line.decode('latin-1').split()
+
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+
+    # Discard any request body so the connection stays in sync for keep-alive
+    content_length = int(headers.get('content-length', 0))
+    if content_length:
+        await reader.readexactly(content_length)
+    return method, target, version, headers
+
+
+def make_handler(artifact, cache):
+    async def handle_connection(reader, writer):
+        try:
+            while True:
+                try:
+                    request = await read_request(reader)
+                except (ValueError, asyncio.IncompleteReadError):
+                    break
+                if request is None:
+                    break
+                method, target, version, headers = request
+
+                status, response_headers, body = handle_request(artifact, cache, method, target, headers)
+                keep_alive = headers.get('connection', '').lower() != 'close' and version == 'HTTP/1.1'
+                response_headers['Content-Length'] = str(len(body))
+                response_headers['Connection'] = 'keep-alive' if keep_alive else 'close'
+
+                head = f'HTTP/1.1 {status} {REASONS[status]}\r\n'
+                head += ''.join(f'{name}: {value}\r\n' for name, value in response_headers.items())
+                writer.write(head.encode('latin-1') + b'\r\n')
+                if method != 'HEAD':
+                    writer.write(body)
+                await writer.drain()
+
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    return handle_connection
+
+
+async def serve(artifact, host, port, cache_size=DEFAULT_CACHE_SIZE):
+    """
+    Serve the artifact over HTTP until cancelled.
+    """
+    cache = ResponseCache(cache_size)
+    server = await asyncio.start_server(make_handler(artifact, cache), host, port)
+    print(f"Serving artifact version {artifact.version} on http://{host}:{port}")
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    # Load environment variables from a .env file to get the artifact location and bind address
+    load_dotenv()
+
+    artifact_path = os.getenv("MERGED_ARTIFACT_PATH", "merged_country_olympics_data.parquet")
+    host = os.getenv("SERVICE_HOST", "127.0.0.1")
+    port = int(os.getenv("SERVICE_PORT", "8080"))
+    cache_size = int(os.getenv("SERVICE_CACHE_SIZE", DEFAULT_CACHE_SIZE))
+
+    # Load the artifact once; every request is then served from memory
+    artifact = load_artifact(artifact_path)
+    asyncio.run(serve(artifact, host, port, cache_size))
+
+
+if __name__ == "__main__":
+    main()
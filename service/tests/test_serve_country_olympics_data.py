@@ -0,0 +1,138 @@
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+
+import pandas as pd
+
+from service.serve_country_olympics_data import (
+    ResponseCache,
+    encode_cursor,
+    handle_request,
+    load_artifact,
+    make_handler,
+)
+
+
+class TestServeCountryOlympicsData(unittest.TestCase):
+    def setUp(self):
+        # Write a small merged artifact to a temporary directory
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.artifact_path = os.path.join(self.temp_dir.name, "merged.parquet")
+        df = pd.DataFrame({
+            'id_x': [1, 2, 3, 4],
+            'nation': ['usa', 'chn', 'usa', 'nor'],
+            'year': [2004, 2004, 2008, 2004],
+            'gold': [36, 32, 36, 0],
+            'silver': [39, 17, 38, 0],
+            'bronze': [26, 15, 36, 1],
+            'total': [101, 64, 110, 1],
+            'noc_code': ['usa', 'chn', 'usa', 'nor'],
+            'country_name': ['united states', 'china', 'united states', 'norway'],
+            'population': [298444215, 1313973713, 298444215, 4610820],
+            'gdp_($_per_capita)': [37800.0, 5000.0, 37800.0, None],
+        })
+        df.to_parquet(self.artifact_path, index=False)
+        self.artifact = load_artifact(self.artifact_path)
+        self.cache = ResponseCache(max_entries=2)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def get(self, target, headers=None):
+        status, response_headers, body = handle_request(self.artifact, self.cache, 'GET', target, headers or {})
+        return status, response_headers, json.loads(body) if body else None
+
+    def test_medal_table_is_ranked(self):
+        status, _, payload = self.get('/medals?year=2004')
+        self.assertEqual(status, 200)
+        self.assertEqual([item['nation'] for item in payload['items']], ['usa', 'chn', 'nor'])
+        self.assertIsNone(payload['next_cursor'])
+
+    def test_season_filter(self):
+        df = pd.read_parquet(self.artifact_path)
+        df['season'] = ['summer', 'summer', 'summer', 'winter']
+        df.to_parquet(self.artifact_path, index=False)
+        self.artifact = load_artifact(self.artifact_path)
+
+        _, _, payload = self.get('/medals?season=winter')
+        self.assertEqual([(item['nation'], item['season']) for item in payload['items']], [('nor', 'winter')])
+        _, _, country = self.get('/nations/nor')
+        self.assertNotIn('season', country)
+
+    def test_cursor_pagination(self):
+        _, _, first = self.get('/medals?year=2004&limit=2')
+        self.assertEqual(len(first['items']), 2)
+        _, _, second = self.get(f"/medals?year=2004&limit=2&cursor={first['next_cursor']}")
+        self.assertEqual([item['nation'] for item in second['items']], ['nor'])
+        self.assertIsNone(second['next_cursor'])
+
+    def test_invalid_cursor(self):
+        status, _, payload = self.get('/medals?cursor=not-a-cursor')
+        self.assertEqual(status, 400)
+        self.assertIn('error', payload)
+
+        status, _, _ = self.get(f"/medals?cursor={encode_cursor(self.artifact.version, -2)}")
+        self.assertEqual(status, 400)
+
+    def test_nation_history_and_country_stats(self):
+        _, _, history = self.get('/nations/USA/medals')
+        self.assertEqual([item['year'] for item in history['items']], [2004, 2008])
+
+        status, _, country = self.get('/nations/nor')
+        self.assertEqual(status, 200)
+        self.assertEqual(country['country_name'], 'norway')
+        self.assertIsNone(country['gdp_($_per_capita)'])
+
+        status, _, _ = self.get('/nations/xyz')
+        self.assertEqual(status, 404)
+
+    def test_etag_and_if_none_match(self):
+        status, headers, _ = self.get('/medals')
+        self.assertEqual(headers['ETag'], f'"{self.artifact.version}"')
+        status, _, body = self.get('/medals', {'if-none-match': headers['ETag']})
+        self.assertEqual(status, 304)
+        self.assertIsNone(body)
+
+        # Errors are never validated by the artifact ETag
+        status, _, _ = self.get('/nope', {'if-none-match': headers['ETag']})
+        self.assertEqual(status, 404)
+        status, _, _ = self.get('/medals?cursor=not-a-cursor', {'if-none-match': '*'})
+        self.assertEqual(status, 400)
+
+    def test_response_cache_is_bounded(self):
+        self.get('/medals')
+        self.get('/nations')
+        self.get('/nations/usa')
+        self.assertEqual(len(self.cache), 2)
+
+    def test_server_keep_alive(self):
+        async def exchange():
+            server = await asyncio.start_server(make_handler(self.artifact, self.cache), '127.0.0.1', 0)
+            port = server.sockets[0].getsockname()[1]
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            responses = []
+            for target in ('/nations', '/medals?year=2008'):
+                writer.write(f'GET {target} HTTP/1.1\r\nHost: localhost\r\n\r\n'.encode())
+                await writer.drain()
+                status_line = await reader.readline()
+                headers = {}
+                while (line := await reader.readline()) != b'\r\n':
+                    name, _, value = line.decode().partition(':')
+                    headers[name.lower()] = value.strip()
+                body = await reader.readexactly(int(headers['content-length']))
+                responses.append((status_line, json.loads(body)))
+            writer.close()
+            server.close()
+            await server.wait_closed()
+            return responses
+
+        responses = asyncio.run(exchange())
+        self.assertTrue(responses[0][0].startswith(b'HTTP/1.1 200'))
+        self.assertEqual(responses[0][1]['items'], ['chn', 'nor', 'usa'])
+        self.assertEqual(responses[1][1]['items'][0]['total'], 110)
+
+
+if __name__ == "__main__":
+    unittest.main()